@@ -3,22 +3,35 @@ Générateur de devis intelligent.
 Utilise le RAG et OpenAI pour créer des devis personnalisés.
 """
 
+import hashlib
 import json
 import logging
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from pydantic import ValidationError
 
 from src.models import LeadRequest, DevisContent, DevisItem
 from src.agent.prompts import get_system_prompt, build_user_prompt
-from src.agent.devis_schemas import LLMDevisPayload, extract_json_from_text
+from src.agent.devis_schemas import DEVIS_PAYLOAD_ADAPTER, extract_json_from_text
 from src.integrations.openai_service import get_openai_service
 from src.integrations.qdrant_service import get_qdrant_service
 from src.integrations.perplexity_service import research_company_cached
 
 logger = logging.getLogger(__name__)
 
+# Cache exact des réponses LLM: les prompts déterminent entièrement la
+# requête, donc une re-soumission du même lead (retry webhook, doublon Tally)
+# est servie sans rappeler l'API (même logique que _company_cache côté
+# Perplexity)
+_llm_response_cache: dict[str, str] = {}
+
+
+def _prompt_hash(system_prompt: str, user_prompt: str, context: str) -> str:
+    """Clé de cache SHA256 pour un triplet (system, user, contexte)."""
+    payload = "\x00".join((system_prompt, user_prompt, context))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
 
 class DevisGenerator:
     """
@@ -86,15 +99,25 @@ class DevisGenerator:
         )
         
         # 5. Génération via LLM avec mode JSON pour forcer une sortie structurée
-        logger.info("Appel OpenAI pour génération du devis (mode JSON activé)...")
-        response = self.openai.generate_completion(
-            prompt=user_prompt,
-            system_prompt=system_prompt,
-            context=full_context,
-            max_tokens=2500,
-            temperature=0.5,  # Réduit pour plus de cohérence structurelle
-            json_mode=True,   # Force le LLM à retourner du JSON valide
-        )
+        # (avec cache exact: un lead strictement identique ne rappelle pas l'API)
+        cache_key = _prompt_hash(system_prompt, user_prompt, full_context)
+        response = _llm_response_cache.get(cache_key)
+        if response is not None:
+            logger.info("♻️ Réponse LLM servie depuis le cache (lead identique)")
+        else:
+            logger.info("Appel OpenAI pour génération du devis (mode JSON activé)...")
+            response = self.openai.generate_completion(
+                prompt=user_prompt,
+                system_prompt=system_prompt,
+                context=full_context,
+                max_tokens=2500,
+                temperature=0.5,  # Réduit pour plus de cohérence structurelle
+                json_mode=True,   # Force le LLM à retourner du JSON valide
+                # Le prompt système est invariant par type de service: une clé
+                # stable par spécialité maximise les hits du cache de préfixe
+                prompt_cache_key=f"devis-{lead.service_type.value}",
+            )
+            _llm_response_cache[cache_key] = response
         
         # 6. Parsing du JSON avec validation
         devis_data = self._parse_response(response, lead)
@@ -193,7 +216,7 @@ class DevisGenerator:
         # === ÉTAPE 1: Tentative directe ===
         try:
             data = json.loads(cleaned)
-            validated = LLMDevisPayload.model_validate(data)
+            validated = DEVIS_PAYLOAD_ADAPTER.validate_python(data)
             logger.info("✅ JSON parsé et validé avec succès (stratégie: directe)")
             return validated.model_dump()
         except json.JSONDecodeError:
@@ -207,7 +230,7 @@ class DevisGenerator:
         if extracted:
             try:
                 data = json.loads(extracted)
-                validated = LLMDevisPayload.model_validate(data)
+                validated = DEVIS_PAYLOAD_ADAPTER.validate_python(data)
                 logger.info("✅ JSON extrait et validé avec succès (stratégie: extraction)")
                 return validated.model_dump()
             except json.JSONDecodeError as e:
@@ -282,10 +305,9 @@ class DevisGenerator:
         if data.get("message_personnel"):
             intro_parts.append(data["message_personnel"])
         
+        # created_at et valid_until (créée + 30 jours) sont déduits par le modèle
         return DevisContent(
             reference=reference,
-            created_at=datetime.now(),
-            valid_until=datetime.now() + timedelta(days=30),
             client_name=lead.full_name,
             client_email=lead.email,
             client_company=lead.company,
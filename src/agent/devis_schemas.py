@@ -3,10 +3,30 @@ Schémas Pydantic pour la validation des réponses du LLM.
 Utilisés pour parser et valider les devis générés par l'IA.
 """
 
+import json
 import re
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, TypeAdapter, field_validator
 from typing import Optional
 
+# orjson (optionnel) accélère la validation des candidats JSON extraits;
+# repli transparent sur le json de la stdlib s'il n'est pas installé
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _is_valid_json(candidate: str) -> bool:
+    """Teste si une chaîne est un document JSON valide."""
+    try:
+        if orjson is not None:
+            orjson.loads(candidate)
+        else:
+            json.loads(candidate)
+        return True
+    except ValueError:
+        return False
+
 
 class LLMDevisLine(BaseModel):
     """
@@ -64,6 +84,11 @@ class LLMDevisPayload(BaseModel):
         return v
 
 
+# TypeAdapter construit une seule fois à l'import: le schéma de validation
+# est compilé ici plutôt qu'à chaque appel de model_validate dans le parsing
+DEVIS_PAYLOAD_ADAPTER: TypeAdapter[LLMDevisPayload] = TypeAdapter(LLMDevisPayload)
+
+
 # Regex pour extraire un objet JSON d'une réponse textuelle
 # Capture le premier bloc {...} même si du texte l'entoure
 JSON_OBJECT_PATTERN = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
@@ -78,15 +103,18 @@ def extract_json_from_text(text: str) -> str | None:
     
     Args:
         text: Texte potentiellement contenant un objet JSON
-        
+
     Returns:
-        Le premier objet JSON trouvé, ou None
+        Le plus long objet JSON valide trouvé, ou None
     """
     # Cherche tous les candidats JSON
     matches = JSON_OBJECT_PATTERN.findall(text)
-    
-    # Retourne le match le plus long (probablement le JSON complet)
-    if matches:
-        return max(matches, key=len)
-    
+
+    # Retourne le candidat valide le plus long (probablement le JSON complet):
+    # tester du plus long au plus court évite de retourner un fragment quand
+    # la réponse contient plusieurs blocs entre accolades
+    for candidate in sorted(matches, key=len, reverse=True):
+        if _is_valid_json(candidate):
+            return candidate
+
     return None
@@ -4,6 +4,7 @@ Coordonne le flux complet: Lead → Devis → PDF → Email.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -15,6 +16,9 @@ from src.integrations.gmail_service import get_gmail_service
 
 logger = logging.getLogger(__name__)
 
+# Nombre maximal de leads traités en parallèle par process_leads
+MAX_CONCURRENT_LEADS = 5
+
 
 @dataclass
 class ProcessingResult:
@@ -60,18 +64,18 @@ class AgentOrchestrator:
         """
         start_time = datetime.now()
         
-        logger.info(f"🚀 Début traitement lead: {lead.full_name} ({lead.tally_response_id})")
+        logger.info("🚀 Début traitement lead: %s (%s)", lead.full_name, lead.tally_response_id)
         
         try:
             # Étape 1: Génération du devis (avec contexte entreprise pour l'email)
             logger.info("📝 Étape 1/4: Génération du devis...")
             devis, company_context = self.devis_generator.generate_with_context(lead)
-            logger.info(f"   → Devis {devis.reference} généré ({devis.total_ttc:.2f}€ TTC)")
+            logger.info("   → Devis %s généré (%.2f€ TTC)", devis.reference, devis.total_ttc)
             
-            # Étape 2: Génération du PDF
+            # Étape 2: Génération du PDF (octets conservés pour la pièce jointe)
             logger.info("📄 Étape 2/4: Génération du PDF...")
-            pdf_path = self.pdf_service.generate(devis)
-            logger.info(f"   → PDF créé: {pdf_path}")
+            pdf_path, pdf_bytes = self.pdf_service.generate_with_bytes(devis)
+            logger.info("   → PDF créé: %s", pdf_path)
             
             # Étape 3: Génération de l'email personnalisé par IA
             logger.info("✉️ Étape 3/4: Génération de l'email IA...")
@@ -80,11 +84,11 @@ class AgentOrchestrator:
                 devis=devis,
                 company_context=company_context if company_context else None,
             )
-            logger.info(f"   → Email généré - Sujet: {email.subject[:50]}...")
+            logger.info("   → Email généré - Sujet: %s...", email.subject[:50])
             
             # Étape 4: Création du brouillon Gmail
             draft_id = None
-            logger.info(f"📧 Étape 4/4: Vérification configuration Gmail...")
+            logger.info("📧 Étape 4/4: Vérification configuration Gmail...")
             if self.gmail_service.is_configured():
                 logger.info("📧 Création du brouillon Gmail...")
                 try:
@@ -92,19 +96,20 @@ class AgentOrchestrator:
                         to=lead.email,
                         subject=email.subject,
                         body_html=email.body_html,
-                        attachment_path=pdf_path,
+                        attachment_bytes=pdf_bytes,
+                        attachment_filename=f"{devis.reference}.pdf",
                     )
                     draft_id = draft_result['draft_id']
-                    logger.info(f"   → Brouillon {draft_id} créé avec succès")
+                    logger.info("   → Brouillon %s créé avec succès", draft_id)
                 except Exception as e:
-                    logger.error(f"   ❌ Erreur CRITIQUE création brouillon: {e}", exc_info=True)
+                    logger.error("   ❌ Erreur CRITIQUE création brouillon: %s", e, exc_info=True)
             else:
                 logger.warning("📧 Gmail non configuré (credentials.json ou token.json manquant/invalide)")
             
             # Calcul du temps de traitement
             processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
             
-            logger.info(f"✅ Lead traité avec succès en {processing_time}ms")
+            logger.info("✅ Lead traité avec succès en %sms", processing_time)
             
             return ProcessingResult(
                 success=True,
@@ -119,7 +124,7 @@ class AgentOrchestrator:
             
         except Exception as e:
             processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
-            logger.exception(f"❌ Erreur traitement lead: {e}")
+            logger.exception("❌ Erreur traitement lead: %s", e)
             
             return ProcessingResult(
                 success=False,
@@ -128,6 +133,36 @@ class AgentOrchestrator:
                 processing_time_ms=processing_time,
             )
 
+    def process_leads(self, leads: list[LeadRequest]) -> list[ProcessingResult]:
+        """
+        Traite plusieurs leads en parallèle (jusqu'à MAX_CONCURRENT_LEADS).
+
+        Chaque lead passe par le pipeline complet process_lead; les appels
+        LLM partent en parallèle, ce qui amortit les latences réseau et
+        maximise les hits du cache de préfixe côté provider (seuls 3 prompts
+        système distincts existent). process_lead capture ses propres
+        exceptions: l'ordre des résultats suit celui des leads en entrée.
+
+        Args:
+            leads: Les leads à traiter
+
+        Returns:
+            Liste de ProcessingResult, dans l'ordre des leads
+        """
+        if not leads:
+            return []
+        if len(leads) == 1:
+            return [self.process_lead(leads[0])]
+
+        logger.info("🚀 Traitement en lot de %d leads...", len(leads))
+        workers = min(MAX_CONCURRENT_LEADS, len(leads))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self.process_lead, leads))
+
+        succeeded = sum(1 for r in results if r.success)
+        logger.info("✅ Lot terminé: %d/%d leads traités avec succès", succeeded, len(leads))
+        return results
+
 
 def get_orchestrator() -> AgentOrchestrator:
     """Factory pour obtenir une instance de l'orchestrateur."""
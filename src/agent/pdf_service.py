@@ -5,6 +5,7 @@ Utilise ReportLab pour créer des devis professionnels.
 
 import logging
 import os
+from copy import deepcopy
 from datetime import datetime
 from io import BytesIO
 from pathlib import Path
@@ -32,8 +33,71 @@ logger = logging.getLogger(__name__)
 PDF_OUTPUT_DIR = Path("generated_pdfs")
 PDF_OUTPUT_DIR.mkdir(exist_ok=True)
 
-# Chemin du logo
-LOGO_PATH = Path(r"C:\Users\jimmy\Projet\agent_juliette\img\logo-nana.png")
+# Chemin du logo, relatif au dépôt (plus de chemin absolu machine-dépendant).
+LOGO_PATH = Path(__file__).resolve().parents[2] / "img" / "logo-nana.png"
+
+# Le logo source (2048×2048, ~6 MB) est très surdimensionné pour un affichage
+# en 4×1.2 cm: embarqué tel quel, il gonflerait chaque PDF (et chaque brouillon
+# Gmail, +33% en base64) de plusieurs MB. Il est donc sous-échantillonné UNE
+# FOIS à l'import via Pillow (déjà requis par ReportLab pour lire les PNG) et
+# gardé en mémoire; 300 px suffisent largement à 1.2 cm même en impression.
+_LOGO_MAX_PX = 300
+
+
+def _load_logo_data() -> bytes | None:
+    """Charge le logo sous-échantillonné (None si le fichier est absent)."""
+    if not LOGO_PATH.is_file():
+        return None
+    try:
+        from PIL import Image as PILImage
+
+        with PILImage.open(LOGO_PATH) as im:
+            if max(im.size) > _LOGO_MAX_PX:
+                im.thumbnail((_LOGO_MAX_PX, _LOGO_MAX_PX), PILImage.Resampling.LANCZOS)
+                buffer = BytesIO()
+                im.save(buffer, format="PNG", optimize=True)
+                return buffer.getvalue()
+    except Exception as e:
+        logger.warning(f"Redimensionnement du logo échoué: {e}")
+    return LOGO_PATH.read_bytes()
+
+
+_LOGO_DATA = _load_logo_data()
+
+# Polices du document. Si une police TTF est fournie dans fonts/, elle est
+# enregistrée (et subsettée par ReportLab) une seule fois à l'import, au lieu
+# de reconfigurer les métriques par style. Sinon, fallback sur Helvetica
+# (police de base PDF, aucun embarquement nécessaire).
+_FONTS_DIR = Path(__file__).resolve().parents[2] / "fonts"
+
+
+def _register_fonts() -> tuple[str, str]:
+    """Enregistre les polices TTF embarquées si disponibles (une seule fois)."""
+    regular = _FONTS_DIR / "Inter-Regular.ttf"
+    bold = _FONTS_DIR / "Inter-Bold.ttf"
+    if regular.is_file() and bold.is_file():
+        try:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            pdfmetrics.registerFont(TTFont("Nana", str(regular)))
+            pdfmetrics.registerFont(TTFont("Nana-Bold", str(bold)))
+            return "Nana", "Nana-Bold"
+        except Exception as e:
+            logger.warning(f"Enregistrement des polices TTF échoué: {e}")
+    return "Helvetica", "Helvetica-Bold"
+
+
+FONT_REGULAR, FONT_BOLD = _register_fonts()
+
+# Largeurs de colonnes des tableaux du devis, évaluées une seule fois à
+# l'import (évite de refaire les multiplications par cm à chaque PDF)
+_HEADER_COL_WIDTHS = (10*cm, 8*cm)
+_INFO_COL_WIDTHS = (9*cm, 9*cm)
+_OBJET_COL_WIDTHS = (18*cm,)
+_ITEMS_COL_WIDTHS = (10.5*cm, 1.5*cm, 3*cm, 3*cm)
+_TOTALS_COL_WIDTHS = (4*cm, 4*cm)
+_SIG_COL_WIDTHS = (9*cm, 9*cm)
 
 # Couleurs nana-intelligence
 COLORS = {
@@ -66,6 +130,7 @@ class PDFService:
     def __init__(self):
         self.styles = getSampleStyleSheet()
         self._setup_custom_styles()
+        self._build_story = self._compile_template()
         logger.info("PDFService initialisé")
     
     def _setup_custom_styles(self):
@@ -78,7 +143,7 @@ class PDFService:
             textColor=COLORS["primary"],
             spaceAfter=5,
             alignment=TA_LEFT,
-            fontName='Helvetica-Bold',
+            fontName=FONT_BOLD,
         ))
         
         # Sous-titre (Référence)
@@ -88,7 +153,7 @@ class PDFService:
             fontSize=10,
             textColor=COLORS["medium"],
             alignment=TA_RIGHT,
-            fontName='Helvetica-Bold',
+            fontName=FONT_BOLD,
         ))
         
         # En-tête de section
@@ -99,7 +164,7 @@ class PDFService:
             textColor=COLORS["primary"],
             spaceBefore=15,
             spaceAfter=8,
-            fontName='Helvetica-Bold',
+            fontName=FONT_BOLD,
             textTransform='uppercase',
         ))
         
@@ -129,7 +194,7 @@ class PDFService:
             parent=self.styles['Normal'],
             fontSize=10,
             textColor=colors.white,
-            fontName='Helvetica-Bold',
+            fontName=FONT_BOLD,
             alignment=TA_CENTER,
         ))
         
@@ -141,64 +206,108 @@ class PDFService:
             alignment=TA_LEFT,
         ))
     
+    def _compile_template(self):
+        """
+        Compile le "template" de devis en une closure réutilisable.
+
+        La structure du document est identique pour tous les devis:
+        seules les données (client, lignes, totaux) varient. Les sections
+        totalement invariantes (signature, pied de page) sont construites
+        une seule fois ici comme prototypes, puis copiées à chaque
+        génération (le parsing du markup des Paragraph n'est fait qu'une
+        fois; les flowables déjà mis en page ne sont pas réutilisables
+        d'un build ReportLab à l'autre).
+        """
+        static_signature = self._build_signature_block()
+        static_footer = self._build_footer()
+
+        def build(devis: DevisContent) -> list:
+            story = []
+
+            # 1. En-tête (Logo + Infos Entreprise + Ref)
+            story.extend(self._build_header(devis))
+
+            # 2. Client & Infos Devis
+            story.extend(self._build_info_block(devis))
+
+            # 3. Objet & Introduction
+            story.extend(self._build_introduction(devis))
+
+            # 4. Tableau des prestations
+            story.extend(self._build_items_table(devis))
+
+            # 5. Totaux
+            story.extend(self._build_totals(devis))
+
+            # 6. Conditions
+            story.extend(self._build_conditions(devis))
+
+            # 7. Signature (Espace pour signature client) - section statique
+            story.extend(deepcopy(static_signature))
+
+            # 8. Footer (Pied de page automatique) - section statique
+            # Note: ReportLab supporte les canvas pour les footers répétitifs,
+            # ici on le met à la fin pour rester simple.
+            story.extend(deepcopy(static_footer))
+
+            return story
+
+        return build
+
     def generate(self, devis: DevisContent) -> str:
         """
         Génère un PDF à partir du contenu du devis.
         """
-        filename = f"{devis.reference}.pdf"
-        filepath = PDF_OUTPUT_DIR / filename
-        
+        filepath, _ = self.generate_with_bytes(devis)
+        return filepath
+
+    def generate_with_bytes(self, devis: DevisContent) -> tuple[str, bytes]:
+        """
+        Génère un PDF et retourne à la fois son chemin et ses octets.
+
+        Le PDF est construit en mémoire puis persisté sur disque pour
+        l'audit; les octets sont retournés pour permettre aux appelants
+        (ex: pièce jointe Gmail) d'éviter une relecture du fichier.
+
+        Returns:
+            tuple: (chemin absolu du fichier, contenu du PDF)
+        """
+        pdf_bytes = self.generate_bytes(devis)
+
+        filepath = PDF_OUTPUT_DIR / f"{devis.reference}.pdf"
+        filepath.write_bytes(pdf_bytes)
+
+        logger.info(f"✅ PDF généré: {filepath}")
+        return str(filepath.absolute()), pdf_bytes
+
+    def generate_bytes(self, devis: DevisContent) -> bytes:
+        """
+        Génère le PDF en mémoire (sans toucher le disque).
+        """
+        buffer = BytesIO()
+
         doc = SimpleDocTemplate(
-            str(filepath),
+            buffer,
             pagesize=A4,
             rightMargin=1.5*cm,
             leftMargin=1.5*cm,
             topMargin=1.5*cm,
             bottomMargin=1.5*cm,
         )
-        
-        story = []
-        
-        # 1. En-tête (Logo + Infos Entreprise + Ref)
-        story.extend(self._build_header(devis))
-        
-        # 2. Client & Infos Devis
-        story.extend(self._build_info_block(devis))
-        
-        # 3. Objet & Introduction
-        story.extend(self._build_introduction(devis))
-        
-        # 4. Tableau des prestations
-        story.extend(self._build_items_table(devis))
-        
-        # 5. Totaux
-        story.extend(self._build_totals(devis))
-        
-        # 6. Conditions
-        story.extend(self._build_conditions(devis))
-        
-        # 7. Signature (Espace pour signature client)
-        story.extend(self._build_signature_block())
-        
-        # 8. Footer (Pied de page automatique)
-        # Note: ReportLab supporte les canvas pour les footers répétitifs, 
-        # ici on le met à la fin pour rester simple.
-        story.extend(self._build_footer())
-        
-        # Génération
-        doc.build(story)
-        
-        logger.info(f"✅ PDF généré: {filepath}")
-        return str(filepath.absolute())
+
+        # Génération via le template compilé (sections statiques partagées)
+        doc.build(self._build_story(devis))
+
+        return buffer.getvalue()
     
     def _build_header(self, devis: DevisContent) -> list:
         """Construit l'en-tête avec logo et référence."""
         elements = []
         
         logo = None
-        if LOGO_PATH.exists():
+        if _LOGO_DATA is not None:
             try:
-                logo = Image(str(LOGO_PATH), width=4*cm, height=1.2*cm, kind='proportional')
+                logo = Image(BytesIO(_LOGO_DATA), width=4*cm, height=1.2*cm, kind='proportional')
                 logo.hAlign = 'LEFT'
             except Exception as e:
                 logger.error(f"Erreur chargement logo: {e}")
@@ -223,7 +332,7 @@ class PDFService:
         
         header_table = Table([
             [left_header, right_header]
-        ], colWidths=[10*cm, 8*cm])
+        ], colWidths=_HEADER_COL_WIDTHS)
         
         header_table.setStyle(TableStyle([
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
@@ -258,7 +367,7 @@ class PDFService:
 
         info_table = Table([
             [emitter, receiver_elements]
-        ], colWidths=[9*cm, 9*cm])
+        ], colWidths=_INFO_COL_WIDTHS)
         
         info_table.setStyle(TableStyle([
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
@@ -275,8 +384,8 @@ class PDFService:
         
         # Fond coloré pour l'objet
         title_table = Table([[Paragraph(f"OBJET : {devis.title}", 
-                                      ParagraphStyle('t', fontSize=12, fontName='Helvetica-Bold', textColor=colors.white))]],
-                           colWidths=[18*cm])
+                                      ParagraphStyle('t', fontSize=12, fontName=FONT_BOLD, textColor=colors.white))]],
+                           colWidths=_OBJET_COL_WIDTHS)
         title_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, -1), COLORS["primary"]),
             ('LEFTPADDING', (0, 0), (-1, -1), 15),
@@ -325,11 +434,10 @@ class PDFService:
                 desc_cell,
                 Paragraph(str(item.quantity), ParagraphStyle('q', fontSize=10, alignment=TA_CENTER)),
                 Paragraph(f"{item.unit_price:,.2f} €".replace(",", " "), ParagraphStyle('p', fontSize=10, alignment=TA_RIGHT)),
-                Paragraph(f"{item.total:,.2f} €".replace(",", " "), ParagraphStyle('t', fontSize=10, alignment=TA_RIGHT, fontName='Helvetica-Bold')),
+                Paragraph(f"{item.total:,.2f} €".replace(",", " "), ParagraphStyle('t', fontSize=10, alignment=TA_RIGHT, fontName=FONT_BOLD)),
             ])
             
-        col_widths = [10.5*cm, 1.5*cm, 3*cm, 3*cm]
-        items_table = Table(table_data, colWidths=col_widths, repeatRows=1)
+        items_table = Table(table_data, colWidths=_ITEMS_COL_WIDTHS, repeatRows=1)
         
         items_table.setStyle(TableStyle([
             # Header
@@ -367,11 +475,11 @@ class PDFService:
              Paragraph(f"{devis.subtotal:,.2f} €".replace(",", " "), ParagraphStyle('v', alignment=TA_RIGHT, fontSize=11))],
             [Paragraph("TVA (20%)", self.styles['DevisBody']), 
              Paragraph(f"{devis.tva:,.2f} €".replace(",", " "), ParagraphStyle('v', alignment=TA_RIGHT, fontSize=11))],
-            [Paragraph("<b>TOTAL TTC</b>", ParagraphStyle('lb', fontSize=14, fontName='Helvetica-Bold', textColor=colors.white)), 
-             Paragraph(f"<b>{devis.total_ttc:,.2f} €</b>".replace(",", " "), ParagraphStyle('vb', alignment=TA_RIGHT, fontSize=16, fontName='Helvetica-Bold', textColor=colors.white))],
+            [Paragraph("<b>TOTAL TTC</b>", ParagraphStyle('lb', fontSize=14, fontName=FONT_BOLD, textColor=colors.white)), 
+             Paragraph(f"<b>{devis.total_ttc:,.2f} €</b>".replace(",", " "), ParagraphStyle('vb', alignment=TA_RIGHT, fontSize=16, fontName=FONT_BOLD, textColor=colors.white))],
         ]
         
-        totals_table = Table(totals_data, colWidths=[4*cm, 4*cm])
+        totals_table = Table(totals_data, colWidths=_TOTALS_COL_WIDTHS)
         totals_table.setStyle(TableStyle([
             ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
             ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
@@ -388,8 +496,9 @@ class PDFService:
             ('RIGHTPADDING', (1, 2), (1, 2), 15),
         ]))
         
-        # Aligné à droite
-        elements.append(Table([[Spacer(1, 1), totals_table]], colWidths=[10*cm, 8*cm]))
+        # Aligné à droite (directement via hAlign, sans table enveloppante)
+        totals_table.hAlign = 'RIGHT'
+        elements.append(totals_table)
         elements.append(Spacer(1, 1*cm))
         
         return elements
@@ -413,7 +522,7 @@ class PDFService:
              Spacer(1, 2.5*cm)]
         ]
         
-        sig_table = Table(sig_data, colWidths=[9*cm, 9*cm])
+        sig_table = Table(sig_data, colWidths=_SIG_COL_WIDTHS)
         sig_table.setStyle(TableStyle([
             ('VALIGN', (0, 0), (-1, -1), 'TOP'),
             ('BOX', (1, 0), (1, 1), 0.5, COLORS["border"]), # Cadre pour signature client
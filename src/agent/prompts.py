@@ -3,6 +3,10 @@ Prompts système experts pour l'Agent Juliette.
 Chaque spécialité a son propre prompt optimisé pour générer des devis professionnels et détaillés.
 """
 
+import re
+import sys
+from bisect import bisect_left
+
 from src.models import ServiceType
 
 # =============================================================================
@@ -115,8 +119,10 @@ qui démontrent une vraie expertise et qui justifient chaque euro facturé.
 # PROMPTS SPÉCIFIQUES PAR SPÉCIALITÉ
 # =============================================================================
 
-PROMPTS_BY_SERVICE = {
-    ServiceType.MASS_MAILING: """
+# Chaînes multi-KB internées une fois: un module qui n'a besoin que d'une
+# spécialité peut l'importer directement, et toute indexation en aval par
+# identité/hachage de chaîne retombe sur le même objet
+_MASS_MAILING_PROMPT = sys.intern("""
 ═══════════════════════════════════════════════════════════════════════════════
                     SPÉCIALITÉ: MASS MAILING & LEAD GENERATION
 ═══════════════════════════════════════════════════════════════════════════════
@@ -165,9 +171,9 @@ FOURCHETTES DE PRIX INDICATIVES:
 - Budget 1500-3000€: Pack standard (toutes les phases)
 - Budget 3000-5000€: Pack complet (volume leads augmenté + 2 mois suivi)
 - Budget > 5000€: Pack premium (multi-campagnes + formation)
-""",
+""")
 
-    ServiceType.AUTOMATION_IA: """
+_AUTOMATION_IA_PROMPT = sys.intern("""
 ═══════════════════════════════════════════════════════════════════════════════
                     SPÉCIALITÉ: AUTOMATISATION & INTELLIGENCE ARTIFICIELLE
 ═══════════════════════════════════════════════════════════════════════════════
@@ -217,9 +223,9 @@ FOURCHETTES DE PRIX INDICATIVES:
 - Budget 2000-5000€: Pack standard (3-5 workflows + IA basique)
 - Budget 5000-10000€: Pack avancé (workflows complexes + agents IA)
 - Budget > 10000€: Transformation digitale complète
-""",
+""")
 
-    ServiceType.SEO_GROWTH: """
+_SEO_GROWTH_PROMPT = sys.intern("""
 ═══════════════════════════════════════════════════════════════════════════════
                     SPÉCIALITÉ: SEO & GROWTH HACKING
 ═══════════════════════════════════════════════════════════════════════════════
@@ -269,23 +275,119 @@ FOURCHETTES DE PRIX INDICATIVES:
 - Budget 1500-3000€: Pack optimisation (audit + on-page)
 - Budget 3000-5000€: Pack croissance (+ contenu + netlinking)
 - Budget > 5000€: Accompagnement complet (3-6 mois)
-""",
+""")
+
+PROMPTS_BY_SERVICE = {
+    ServiceType.MASS_MAILING: _MASS_MAILING_PROMPT,
+    ServiceType.AUTOMATION_IA: _AUTOMATION_IA_PROMPT,
+    ServiceType.SEO_GROWTH: _SEO_GROWTH_PROMPT,
+}
+
+
+# Prompts système finaux (base + spécialité), assemblés une seule fois à
+# l'import: la concaténation de plusieurs KB n'est plus refaite par appel et
+# les chaînes retournées sont identité-stables (utile pour des clés de cache).
+_SYSTEM_PROMPTS_FINAL = {
+    service_type: sys.intern(f"{SYSTEM_PROMPT_BASE}\n\n{specialty_prompt}")
+    for service_type, specialty_prompt in PROMPTS_BY_SERVICE.items()
 }
 
 
 def get_system_prompt(service_type: ServiceType) -> str:
     """
     Retourne le prompt système complet pour un type de service donné.
-    Combine le prompt de base expert avec le prompt spécifique à la spécialité.
-    
+    Combine le prompt de base expert avec le prompt spécifique à la spécialité
+    (précombiné et interné à l'import, simple lookup ici).
+
     Args:
         service_type: Le type de service demandé
-        
+
     Returns:
         Le prompt système complet (base + spécialité)
+
+    Raises:
+        KeyError: si le ServiceType n'a pas de prompt de spécialité — on
+            échoue immédiatement plutôt que d'envoyer au LLM un prompt
+            silencieusement amputé de sa spécialité
+    """
+    return _SYSTEM_PROMPTS_FINAL[service_type]
+
+
+def get_system_prompt_blocks(service_type: ServiceType) -> list[dict]:
+    """
+    Retourne le prompt système sous forme de blocs structurés, marqués pour
+    le cache de préfixe explicite des providers qui le supportent
+    (Anthropic / Bedrock: `cache_control` ephemeral sur chaque bloc).
+
+    Les deux blocs (base + spécialité) sont invariants par type de service:
+    marqués ainsi, ils ne sont facturés en entier qu'une fois par fenêtre
+    de cache. Côté OpenAI, le cache de préfixe est automatique et c'est la
+    chaîne concaténée de `get_system_prompt` qui reste utilisée.
+
+    Args:
+        service_type: Le type de service demandé
+
+    Returns:
+        Liste de blocs de contenu prêts à passer en message système
     """
-    specialty_prompt = PROMPTS_BY_SERVICE.get(service_type, "")
-    return f"{SYSTEM_PROMPT_BASE}\n\n{specialty_prompt}"
+    blocks = [
+        {
+            "type": "text",
+            "text": SYSTEM_PROMPT_BASE,
+            "cache_control": {"type": "ephemeral"},
+        }
+    ]
+
+    specialty_prompt = PROMPTS_BY_SERVICE.get(service_type)
+    if specialty_prompt:
+        blocks.append({
+            "type": "text",
+            "text": specialty_prompt,
+            "cache_control": {"type": "ephemeral"},
+        })
+
+    return blocks
+
+
+# Lignes de séparation réutilisées dans les prompts, construites une fois
+_EQ80 = "═" * 80
+_DASH40 = "─" * 40
+
+# Préfixe statique du prompt utilisateur. Les caches de préfixe des providers
+# (OpenAI/Anthropic) ne matchent que sur le plus long préfixe commun: tout le
+# squelette invariant (bannières, instructions) est donc placé AVANT les
+# données variables du lead, qui sont repoussées en fin de message.
+_USER_PROMPT_STATIC_PREFIX = "\n".join([
+    _EQ80,
+    "DEMANDE DE DEVIS À TRAITER",
+    _EQ80,
+    "",
+    "INSTRUCTIONS IMPORTANTES:",
+    "",
+    "1. Génère un devis avec **5-8 lignes de prestations** minimum",
+    "2. Chaque ligne doit avoir des **livrables concrets** dans le champ 'details'",
+    "3. L'introduction doit mentionner le **prénom indiqué** et son contexte business",
+    "4. Le total doit **correspondre au budget** indiqué (+/- 20%)",
+    "5. Le message personnel doit référencer un **enjeu spécifique** du prospect",
+    "",
+    "Génère UNIQUEMENT le JSON, sans texte avant ni après.",
+    "",
+    _EQ80,
+    "DONNÉES DU LEAD",
+    _EQ80,
+])
+
+# Entêtes de sections et libellés d'affichage préassemblés à l'import: le
+# rendu par appel se réduit à concaténer les champs dynamiques du lead
+_DESCRIPTION_HEADER = "\n".join((_DASH40, "📝 DESCRIPTION DU BESOIN", _DASH40, ""))
+_BUDGET_HEADER = "\n".join((_DASH40, "💰 BUDGET", _DASH40, ""))
+_RESEARCH_HEADER = "\n".join((_DASH40, "🔍 RECHERCHE ENTREPRISE (Perplexity)", _DASH40, ""))
+
+_SERVICE_DISPLAY = {
+    ServiceType.MASS_MAILING: "Mass Mailing & Lead Generation",
+    ServiceType.AUTOMATION_IA: "Automatisation & IA",
+    ServiceType.SEO_GROWTH: "SEO & Growth",
+}
 
 
 def build_user_prompt(
@@ -300,7 +402,11 @@ def build_user_prompt(
     """
     Construit le prompt utilisateur avec toutes les informations du lead.
     Format optimisé pour guider le LLM vers une génération de qualité.
-    
+
+    Le squelette statique (bannières + instructions) ouvre le message pour
+    rester dans le préfixe cacheable côté provider; les champs variables du
+    lead sont regroupés en fin de prompt.
+
     Args:
         lead_name: Nom complet du prospect
         company: Nom de l'entreprise
@@ -309,102 +415,100 @@ def build_user_prompt(
         budget_range: Fourchette budgétaire
         service_type: Type de service demandé
         company_research: Informations recherchées sur l'entreprise (Perplexity)
-        
+
     Returns:
         Le prompt utilisateur formaté
     """
-    # Extraction du prénom pour personnalisation
-    first_name = lead_name.split()[0] if lead_name else "Prospect"
-    
+    # Extraction du prénom pour personnalisation (partition s'arrête au
+    # premier espace sans allouer la liste complète des tokens)
+    first_name = lead_name.partition(" ")[0] if lead_name else "Prospect"
+
     prompt_parts = [
-        "═" * 80,
-        "DEMANDE DE DEVIS À TRAITER",
-        "═" * 80,
+        _USER_PROMPT_STATIC_PREFIX,
         "",
         f"👤 **Prospect:** {lead_name}",
         f"📧 **Prénom à utiliser:** {first_name}",
     ]
-    
+
     if company:
         prompt_parts.append(f"🏢 **Entreprise:** {company}")
     if website:
         prompt_parts.append(f"🌐 **Site web:** {website}")
-    
+
     # Conversion du service type pour affichage
-    service_display = {
-        ServiceType.MASS_MAILING: "Mass Mailing & Lead Generation",
-        ServiceType.AUTOMATION_IA: "Automatisation & IA",
-        ServiceType.SEO_GROWTH: "SEO & Growth",
-    }.get(service_type, service_type.value)
-    
+    service_display = _SERVICE_DISPLAY.get(service_type, service_type.value)
+
     prompt_parts.extend([
         f"🎯 **Service demandé:** {service_display}",
         "",
-        "─" * 40,
-        "📝 DESCRIPTION DU BESOIN",
-        "─" * 40,
-        "",
+        _DESCRIPTION_HEADER,
         project_description,
         "",
     ])
-    
+
     # Budget avec interprétation
     if budget_range:
         budget_interpretation = _interpret_budget(budget_range)
         prompt_parts.extend([
-            "─" * 40,
-            "💰 BUDGET",
-            "─" * 40,
-            "",
+            _BUDGET_HEADER,
             f"Indication client: **{budget_range}**",
             f"Interprétation: {budget_interpretation}",
             "",
         ])
-    
+
     # Contexte entreprise (recherche Perplexity)
     if company_research:
         prompt_parts.extend([
-            "─" * 40,
-            "🔍 RECHERCHE ENTREPRISE (Perplexity)",
-            "─" * 40,
-            "",
+            _RESEARCH_HEADER,
             company_research,
-            "",
         ])
-    
-    # Instructions finales
-    prompt_parts.extend([
-        "═" * 80,
-        "INSTRUCTIONS IMPORTANTES",
-        "═" * 80,
-        "",
-        "1. Génère un devis avec **5-8 lignes de prestations** minimum",
-        "2. Chaque ligne doit avoir des **livrables concrets** dans le champ 'details'",
-        f"3. L'introduction doit mentionner **{first_name}** et son contexte business",
-        "4. Le total doit **correspondre au budget** indiqué (+/- 20%)",
-        "5. Le message personnel doit référencer un **enjeu spécifique** du prospect",
-        "",
-        "Génère UNIQUEMENT le JSON, sans texte avant ni après.",
-    ])
-    
+
     return "\n".join(prompt_parts)
 
 
+# Extraction des montants d'une fourchette budgétaire ("3-5k€", "1 000", ...)
+# précompilée à l'import, puis choix du palier par bisect sur la borne haute.
+_BUDGET_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(k)?", re.IGNORECASE)
+
+# Paliers triés par borne supérieure (€ HT), pour bisect
+_BUDGET_BUCKET_BOUNDS = (1200, 3000, 5500, 10000)
+_BUDGET_BUCKET_LABELS = (
+    "Budget serré (800-1200€ HT). Pack essentiel uniquement.",
+    "Budget standard (1500-3000€ HT). Pack complet possible.",
+    "Budget confortable (3000-5500€ HT). Pack complet + options.",
+    "Budget élevé (5000-10000€ HT). Accompagnement premium.",
+)
+_BUDGET_TOP_LABEL = "Budget important (10000€+ HT). Projet d'envergure."
+
+
 def _interpret_budget(budget_range: str) -> str:
     """
     Interprète la fourchette budgétaire pour guider le LLM.
+
+    Les montants sont extraits en une passe regex (robuste aux variantes
+    "2k-4k", "3 000 - 5 000€"...), puis le palier est choisi par bisect
+    sur la borne haute de la fourchette.
     """
-    budget_lower = budget_range.lower().replace(" ", "").replace("€", "").replace("eur", "")
-    
-    if "1k" in budget_lower or "1000" in budget_lower or "<1" in budget_lower:
-        return "Budget serré (800-1200€ HT). Pack essentiel uniquement."
-    elif "1-3k" in budget_lower or "1k-3k" in budget_lower or "2k" in budget_lower:
-        return "Budget standard (1500-3000€ HT). Pack complet possible."
-    elif "3-5k" in budget_lower or "3k-5k" in budget_lower or "4k" in budget_lower:
-        return "Budget confortable (3000-5500€ HT). Pack complet + options."
-    elif "5-10k" in budget_lower or "5k-10k" in budget_lower:
-        return "Budget élevé (5000-10000€ HT). Accompagnement premium."
-    elif "10k" in budget_lower or "10000" in budget_lower or "+" in budget_lower:
-        return "Budget important (10000€+ HT). Projet d'envergure."
-    else:
+    compact = budget_range.replace(" ", "").replace(" ", "")
+
+    amounts = []
+    for number, k_suffix in _BUDGET_RE.findall(compact):
+        value = float(number.replace(",", "."))
+        # "3-5k" : le k s'applique aussi aux petites valeurs sans suffixe
+        if k_suffix or value < 100:
+            value *= 1000
+        amounts.append(value)
+
+    if not amounts:
         return f"Budget à adapter selon '{budget_range}'. Proposer un pack standard."
+
+    upper = max(amounts)
+
+    # Budget ouvert vers le haut ("10k+", "> 10 000€") ou montant unique élevé
+    if "+" in compact or (upper >= 10000 and (len(amounts) == 1 or ">" in compact)):
+        return _BUDGET_TOP_LABEL
+
+    index = bisect_left(_BUDGET_BUCKET_BOUNDS, upper)
+    if index >= len(_BUDGET_BUCKET_LABELS):
+        return _BUDGET_TOP_LABEL
+    return _BUDGET_BUCKET_LABELS[index]
@@ -3,7 +3,6 @@ Configuration centralisée de l'application Agent Juliette.
 Utilise pydantic-settings pour la validation et le chargement des variables d'environnement.
 """
 
-from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -34,6 +33,8 @@ class Settings(BaseSettings):
     # Perplexity (recherche entreprise)
     perplexity_api_key: str | None = None
     perplexity_model: str = "sonar"  # sonar (rapide) ou sonar-pro (approfondi)
+    perplexity_rpm: int = 60  # Limite client de requêtes par minute
+    perplexity_concurrency: int = 5  # Recherches async simultanées maximum
 
     # Application
     app_env: str = "development"
@@ -44,10 +45,16 @@ class Settings(BaseSettings):
         return self.app_env == "production"
 
 
-@lru_cache
+# Singleton module-level: la validation pydantic ne tourne qu'une fois,
+# et get_settings se réduit à retourner une référence (pas de machinerie
+# lru_cache sur ce chemin très fréquenté). L'instanciation reste différée
+# au premier accès pour que l'import du module ne dépende pas de l'env.
+_settings: Settings | None = None
+
+
 def get_settings() -> Settings:
-    """
-    Retourne une instance singleton des settings.
-    Utilise lru_cache pour éviter de recharger les variables à chaque appel.
-    """
-    return Settings()
+    """Retourne l'instance singleton des settings (créée au premier appel)."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
@@ -4,27 +4,139 @@ Gère l'authentification OAuth2 et la création de brouillons avec pièces joint
 """
 
 import base64
+import json
 import logging
 import os
-from email.mime.base import MIMEBase
+import threading
+from email.generator import BytesGenerator
+from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from email import encoders
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-
 from src.config import get_settings
 
+# orjson (optionnel) accélère nettement le parsing des payloads JSON;
+# repli transparent sur le json de la stdlib s'il n'est pas installé
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+
+def _loads_json(payload: str):
+    """Parse du JSON avec orjson si disponible, sinon la stdlib."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
 # Scopes requis pour créer des brouillons
 SCOPES = ['https://www.googleapis.com/auth/gmail.compose']
 
+# Table de traduction base64 standard → urlsafe (+/ devient -_)
+_B64_TO_URLSAFE = bytes.maketrans(b'+/', b'-_')
+
+# Template HTML de l'email de devis, construit une seule fois à l'import.
+# Les accolades CSS sont doublées pour échapper au .format().
+_DEVIS_EMAIL_TEMPLATE = """
+        <!DOCTYPE html>
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {{
+                    font-family: Arial, sans-serif;
+                    line-height: 1.6;
+                    color: #1F2937;
+                    max-width: 600px;
+                    margin: 0 auto;
+                }}
+                .header {{
+                    background: linear-gradient(135deg, #6366F1, #8B5CF6);
+                    padding: 30px;
+                    text-align: center;
+                    border-radius: 10px 10px 0 0;
+                }}
+                .header h1 {{
+                    color: white;
+                    margin: 0;
+                    font-size: 24px;
+                }}
+                .content {{
+                    padding: 30px;
+                    background: #ffffff;
+                    border: 1px solid #E5E7EB;
+                }}
+                .highlight {{
+                    background: #F3F4F6;
+                    padding: 20px;
+                    border-radius: 8px;
+                    margin: 20px 0;
+                }}
+                .total {{
+                    font-size: 24px;
+                    color: #6366F1;
+                    font-weight: bold;
+                }}
+                .footer {{
+                    padding: 20px;
+                    text-align: center;
+                    font-size: 12px;
+                    color: #6B7280;
+                    background: #F9FAFB;
+                    border-radius: 0 0 10px 10px;
+                }}
+                .cta {{
+                    display: inline-block;
+                    background: #6366F1;
+                    color: white;
+                    padding: 12px 30px;
+                    text-decoration: none;
+                    border-radius: 6px;
+                    margin: 20px 0;
+                }}
+            </style>
+        </head>
+        <body>
+            <div class="header">
+                <h1>nana-intelligence</h1>
+            </div>
+
+            <div class="content">
+                <p>Bonjour <strong>{client_name}</strong>,</p>
+
+                <p>Suite à votre demande, j'ai le plaisir de vous transmettre notre proposition commerciale.</p>
+
+                <div class="highlight">
+                    <p><strong>📄 Devis n° {devis_reference}</strong></p>
+                    <p>{devis_title}</p>
+                    <p class="total">Total TTC : {total_ttc:,.2f} €</p>
+                </div>
+
+                <p>Vous trouverez le devis détaillé en pièce jointe de cet email au format PDF.</p>
+
+                <p>Ce devis est valable 30 jours. N'hésitez pas à me contacter si vous avez des questions ou si vous souhaitez ajuster certains éléments.</p>
+
+                <p>Je reste à votre disposition pour échanger sur votre projet.</p>
+
+                <p>
+                    Cordialement,<br>
+                    <strong>L'équipe nana-intelligence</strong>
+                </p>
+            </div>
+
+            <div class="footer">
+                <p>nana-intelligence | Automatisation & IA pour TPE/PME</p>
+                <p>contact@nana-intelligence.fr | https://nana-intelligence.fr</p>
+            </div>
+        </body>
+        </html>
+        """
+
 
 class GmailService:
     """
@@ -35,15 +147,25 @@ class GmailService:
     - GMAIL_CREDENTIALS_JSON: Contenu JSON du fichier credentials.json
     - GMAIL_TOKEN_JSON: Contenu JSON du fichier token.json
     """
-    
+
+    # Cache du verdict de is_configured sur credentials.json, invalidé
+    # automatiquement si le fichier est remplacé (clé = chemin + mtime + taille)
+    _CONFIG_CACHE: dict[tuple[str, int, int], bool] = {}
+
     def __init__(self):
         self.settings = get_settings()
         self.credentials_path = Path(self.settings.gmail_credentials_path)
         self.token_path = Path(self.settings.gmail_token_path)
         self.sender_email = self.settings.gmail_sender_email
-        self.service = None
-        self._authenticated = False
-        
+
+        # Credentials partagés entre threads (protégés par _auth_lock), mais
+        # transport et service par thread: httplib2.Http n'est pas thread-safe
+        # et l'instance GmailService est partagée (get_gmail_service est
+        # mis en cache, FastAPI/process_leads appellent depuis un threadpool)
+        self._creds = None
+        self._auth_lock = threading.Lock()
+        self._local = threading.local()
+
         # En production, créer les fichiers depuis les variables d'environnement
         self._setup_credentials_from_env()
         
@@ -54,95 +176,127 @@ class GmailService:
         Crée les fichiers credentials.json et token.json depuis les variables d'env.
         Utilisé en production sur Render.
         """
-        import json
-        
         # Credentials OAuth2
         credentials_json = os.environ.get("GMAIL_CREDENTIALS_JSON")
         if credentials_json and not self.credentials_path.exists():
             try:
                 # Valider que c'est du JSON valide
-                json.loads(credentials_json)
+                _loads_json(credentials_json)
                 with open(self.credentials_path, 'w') as f:
                     f.write(credentials_json)
                 logger.info("✅ credentials.json créé depuis variable d'environnement")
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"GMAIL_CREDENTIALS_JSON n'est pas du JSON valide: {e}")
-        
+
         # Token OAuth2 (pré-généré en local)
         token_json = os.environ.get("GMAIL_TOKEN_JSON")
         if token_json and not self.token_path.exists():
             try:
                 # Valider que c'est du JSON valide
-                json.loads(token_json)
+                _loads_json(token_json)
                 with open(self.token_path, 'w') as f:
                     f.write(token_json)
                 logger.info("✅ token.json créé depuis variable d'environnement")
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 logger.error(f"GMAIL_TOKEN_JSON n'est pas du JSON valide: {e}")
     
     def _authenticate(self) -> bool:
         """
         Gère l'authentification OAuth2.
-        
+
+        Le cycle de vie du token (chargement, refresh, sauvegarde) est
+        sérialisé par _auth_lock: deux threads ne peuvent pas rafraîchir
+        le même token ni écrire token.json en parallèle.
+
         Returns:
             True si l'authentification a réussi
         """
-        if self._authenticated and self.service:
+        if getattr(self._local, 'service', None) is not None:
             return True
-        
-        creds = None
-        
-        # Charger le token existant
-        if self.token_path.exists():
-            try:
-                creds = Credentials.from_authorized_user_file(str(self.token_path), SCOPES)
-                logger.debug("Token existant chargé")
-            except Exception as e:
-                logger.warning(f"Erreur chargement token: {e}")
-        
-        # Rafraîchir ou créer les credentials
-        if not creds or not creds.valid:
-            if creds and creds.expired and creds.refresh_token:
+
+        # Imports différés: googleapiclient, oauthlib et httplib2 coûtent
+        # plusieurs centaines de ms à charger — on ne les paie qu'à la
+        # première création de brouillon, pas au démarrage du process
+        import google_auth_httplib2
+        import httplib2
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from googleapiclient.discovery import build
+
+        with self._auth_lock:
+            creds = self._creds
+            creds_changed = False
+
+            # Charger le token existant
+            if creds is None and self.token_path.exists():
                 try:
-                    creds.refresh(Request())
-                    logger.info("Token rafraîchi avec succès")
-                    # Sauvegarder le token rafraîchi
-                    with open(self.token_path, 'w') as token:
-                        token.write(creds.to_json())
+                    creds = Credentials.from_authorized_user_file(str(self.token_path), SCOPES)
+                    logger.debug("Token existant chargé")
                 except Exception as e:
-                    logger.warning(f"Erreur rafraîchissement token: {e}")
-                    creds = None
-            
-            if not creds:
-                if not self.credentials_path.exists():
-                    logger.error(f"Fichier credentials non trouvé: {self.credentials_path}")
-                    return False
-                
-                # En production, on ne peut pas lancer un navigateur
-                # Le token doit être pré-généré
-                if os.environ.get("APP_ENV") == "production":
-                    logger.error(
-                        "Token Gmail invalide en production. "
-                        "Régénérez le token en local et mettez à jour GMAIL_TOKEN_JSON"
+                    logger.warning(f"Erreur chargement token: {e}")
+
+            # Rafraîchir ou créer les credentials
+            if not creds or not creds.valid:
+                if creds and creds.expired and creds.refresh_token:
+                    try:
+                        creds.refresh(Request())
+                        creds_changed = True
+                        logger.info("Token rafraîchi avec succès")
+                    except Exception as e:
+                        logger.warning(f"Erreur rafraîchissement token: {e}")
+                        creds = None
+
+                if not creds:
+                    if not self.credentials_path.exists():
+                        logger.error(f"Fichier credentials non trouvé: {self.credentials_path}")
+                        return False
+
+                    # En production, on ne peut pas lancer un navigateur
+                    # Le token doit être pré-généré
+                    if os.environ.get("APP_ENV") == "production":
+                        logger.error(
+                            "Token Gmail invalide en production. "
+                            "Régénérez le token en local et mettez à jour GMAIL_TOKEN_JSON"
+                        )
+                        return False
+
+                    # Lancer le flux OAuth2 (nécessite interaction utilisateur)
+                    flow = InstalledAppFlow.from_client_secrets_file(
+                        str(self.credentials_path), SCOPES
                     )
-                    return False
-                
-                # Lancer le flux OAuth2 (nécessite interaction utilisateur)
-                flow = InstalledAppFlow.from_client_secrets_file(
-                    str(self.credentials_path), SCOPES
-                )
-                creds = flow.run_local_server(port=0)
-                logger.info("Nouvelle authentification OAuth2 réussie")
-            
-            # Sauvegarder le token
-            with open(self.token_path, 'w') as token:
-                token.write(creds.to_json())
+                    creds = flow.run_local_server(port=0)
+                    creds_changed = True
+                    logger.info("Nouvelle authentification OAuth2 réussie")
+
+            # Sauvegarder le token seulement s'il a changé, et de manière atomique
+            # (écriture dans un .tmp puis os.replace) pour ne jamais laisser un
+            # token.json tronqué en cas d'interruption
+            if creds_changed:
+                tmp_path = self.token_path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as token:
+                    token.write(creds.to_json())
+                os.replace(tmp_path, self.token_path)
                 logger.debug(f"Token sauvegardé: {self.token_path}")
-        
-        # Créer le service Gmail
-        self.service = build('gmail', 'v1', credentials=creds)
-        self._authenticated = True
-        
+
+            self._creds = creds
+
+        # Créer le service Gmail (discovery statique: pas d'aller-retour réseau
+        # ni de cache disque pour récupérer le document de découverte).
+        # Le transport httplib2 est construit UNE FOIS PAR THREAD et réutilisé:
+        # les créations de brouillons successives d'un même thread partagent
+        # le même canal TLS, sans jamais partager une connexion httplib2
+        # (non thread-safe) entre deux threads concurrents
+        authorized_http = google_auth_httplib2.AuthorizedHttp(
+            creds, http=httplib2.Http(timeout=20)
+        )
+        self._local.service = build(
+            'gmail', 'v1',
+            http=authorized_http,
+            cache_discovery=False,
+            static_discovery=True,
+        )
+
         return True
     
     def create_draft(
@@ -151,55 +305,78 @@ class GmailService:
         subject: str,
         body_html: str,
         attachment_path: str | None = None,
+        attachment_bytes: bytes | None = None,
+        attachment_filename: str | None = None,
     ) -> dict:
         """
         Crée un brouillon d'email dans Gmail.
-        
+
         Args:
             to: Adresse email du destinataire
             subject: Sujet de l'email
             body_html: Corps de l'email en HTML
             attachment_path: Chemin vers le fichier à joindre (optionnel)
-            
+            attachment_bytes: Contenu du PDF à joindre directement, sans
+                relecture depuis le disque (prioritaire sur attachment_path)
+            attachment_filename: Nom de la pièce jointe (avec attachment_bytes)
+
         Returns:
             dict avec 'draft_id' et 'message_id'
         """
         if not self._authenticate():
             raise RuntimeError("Authentification Gmail échouée")
-        
+
+        from googleapiclient.errors import HttpError
+
         # Création du message MIME
         message = MIMEMultipart()
         message['to'] = to
         message['from'] = self.sender_email
         message['subject'] = subject
-        
+
         # Corps HTML
         html_part = MIMEText(body_html, 'html', 'utf-8')
         message.attach(html_part)
-        
-        # Pièce jointe
-        if attachment_path:
+
+        # Pièce jointe: octets fournis directement (pas d'aller-retour disque)
+        if attachment_bytes is not None:
+            filename = attachment_filename or "devis.pdf"
+            attachment = MIMEApplication(attachment_bytes, _subtype='pdf')
+            attachment.add_header(
+                'Content-Disposition',
+                f'attachment; filename="{filename}"'
+            )
+            message.attach(attachment)
+            logger.debug(f"Pièce jointe ajoutée (en mémoire): {filename}")
+        # Pièce jointe: lecture depuis le disque (chaque PDF de devis a un
+        # nom unique, inutile de mettre la part encodée en cache)
+        elif attachment_path:
             attachment_path = Path(attachment_path)
             if attachment_path.exists():
-                with open(attachment_path, 'rb') as f:
-                    attachment = MIMEBase('application', 'pdf')
-                    attachment.set_payload(f.read())
-                    encoders.encode_base64(attachment)
-                    attachment.add_header(
-                        'Content-Disposition',
-                        f'attachment; filename="{attachment_path.name}"'
-                    )
-                    message.attach(attachment)
-                    logger.debug(f"Pièce jointe ajoutée: {attachment_path.name}")
+                attachment = MIMEApplication(attachment_path.read_bytes(), _subtype='pdf')
+                attachment.add_header(
+                    'Content-Disposition',
+                    f'attachment; filename="{attachment_path.name}"'
+                )
+                message.attach(attachment)
+                logger.debug(f"Pièce jointe ajoutée: {attachment_path.name}")
             else:
                 logger.warning(f"Pièce jointe non trouvée: {attachment_path}")
         
-        # Encodage du message
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Encodage du message: aplatissement MIME dans un buffer réutilisé par
+        # l'encodeur via getbuffer() (pas de copie intermédiaire du message,
+        # sensible quand la pièce jointe PDF pèse plusieurs MB)
+        buffer = BytesIO()
+        BytesGenerator(buffer, mangle_from_=False).flatten(message)
+        raw_message = (
+            base64.b64encode(buffer.getbuffer())
+            .translate(_B64_TO_URLSAFE)
+            .decode('ascii')
+        )
         
         # Création du brouillon
         try:
-            draft = self.service.users().drafts().create(
+            draft = self._local.service.users().drafts().create(
                 userId='me',
                 body={'message': {'raw': raw_message}}
             ).execute()
@@ -219,7 +396,7 @@ class GmailService:
         except HttpError as e:
             logger.error(f"Erreur création brouillon: {e}")
             raise
-    
+
     def create_devis_draft(
         self,
         client_name: str,
@@ -245,100 +422,12 @@ class GmailService:
         """
         subject = f"Votre devis {devis_reference} - nana-intelligence"
         
-        body_html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #1F2937;
-                    max-width: 600px;
-                    margin: 0 auto;
-                }}
-                .header {{
-                    background: linear-gradient(135deg, #6366F1, #8B5CF6);
-                    padding: 30px;
-                    text-align: center;
-                    border-radius: 10px 10px 0 0;
-                }}
-                .header h1 {{
-                    color: white;
-                    margin: 0;
-                    font-size: 24px;
-                }}
-                .content {{
-                    padding: 30px;
-                    background: #ffffff;
-                    border: 1px solid #E5E7EB;
-                }}
-                .highlight {{
-                    background: #F3F4F6;
-                    padding: 20px;
-                    border-radius: 8px;
-                    margin: 20px 0;
-                }}
-                .total {{
-                    font-size: 24px;
-                    color: #6366F1;
-                    font-weight: bold;
-                }}
-                .footer {{
-                    padding: 20px;
-                    text-align: center;
-                    font-size: 12px;
-                    color: #6B7280;
-                    background: #F9FAFB;
-                    border-radius: 0 0 10px 10px;
-                }}
-                .cta {{
-                    display: inline-block;
-                    background: #6366F1;
-                    color: white;
-                    padding: 12px 30px;
-                    text-decoration: none;
-                    border-radius: 6px;
-                    margin: 20px 0;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>nana-intelligence</h1>
-            </div>
-            
-            <div class="content">
-                <p>Bonjour <strong>{client_name}</strong>,</p>
-                
-                <p>Suite à votre demande, j'ai le plaisir de vous transmettre notre proposition commerciale.</p>
-                
-                <div class="highlight">
-                    <p><strong>📄 Devis n° {devis_reference}</strong></p>
-                    <p>{devis_title}</p>
-                    <p class="total">Total TTC : {total_ttc:,.2f} €</p>
-                </div>
-                
-                <p>Vous trouverez le devis détaillé en pièce jointe de cet email au format PDF.</p>
-                
-                <p>Ce devis est valable 30 jours. N'hésitez pas à me contacter si vous avez des questions ou si vous souhaitez ajuster certains éléments.</p>
-                
-                <p>Je reste à votre disposition pour échanger sur votre projet.</p>
-                
-                <p>
-                    Cordialement,<br>
-                    <strong>L'équipe nana-intelligence</strong>
-                </p>
-            </div>
-            
-            <div class="footer">
-                <p>nana-intelligence | Automatisation & IA pour TPE/PME</p>
-                <p>contact@nana-intelligence.fr | https://nana-intelligence.fr</p>
-            </div>
-        </body>
-        </html>
-        """
+        body_html = _DEVIS_EMAIL_TEMPLATE.format(
+            client_name=client_name,
+            devis_reference=devis_reference,
+            devis_title=devis_title,
+            total_ttc=total_ttc,
+        )
         
         return self.create_draft(
             to=client_email,
@@ -358,19 +447,36 @@ class GmailService:
         # Si on a déjà un token, c'est bon
         if self.token_path.exists():
             return True
-        
+
         # Sinon, vérifier le fichier credentials
-        if not self.credentials_path.exists():
+        try:
+            stat = self.credentials_path.stat()
+        except OSError:
             return False
-        
-        # Vérifier que c'est bien un client OAuth2, pas un service account
+
+        # Le verdict ne dépend que du contenu du fichier: inutile de le
+        # reparser à chaque webhook tant qu'il n'a pas changé
+        cache_key = (str(self.credentials_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._CONFIG_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+        result = self._check_credentials_file()
+        self._CONFIG_CACHE[cache_key] = result
+        return result
+
+    def _check_credentials_file(self) -> bool:
+        """
+        Vérifie que credentials.json est bien un client OAuth2, pas un compte
+        de service. Le champ discriminant apparaît dans les premiers octets du
+        fichier: lire 256 octets suffit, sans parse JSON complet.
+        """
         try:
-            import json
-            with open(self.credentials_path, 'r') as f:
-                creds_data = json.load(f)
-            
+            with open(self.credentials_path, 'rb') as f:
+                head = f.read(256)
+
             # Les service accounts ont "type": "service_account"
-            if creds_data.get("type") == "service_account":
+            if b'"service_account"' in head:
                 logger.warning(
                     "Le fichier credentials.json est un compte de service. "
                     "Pour Gmail, vous devez créer un client OAuth2 (Desktop app) "
@@ -378,19 +484,20 @@ class GmailService:
                     "+ CREATE CREDENTIALS > OAuth client ID > Desktop application"
                 )
                 return False
-            
-            # Les clients OAuth2 ont "installed" ou "web"
-            if "installed" in creds_data or "web" in creds_data:
+
+            # Les clients OAuth2 ont "installed" ou "web" en clé racine
+            if b'"installed"' in head or b'"web"' in head:
                 return True
-            
+
             logger.warning(f"Format credentials.json non reconnu")
             return False
-            
+
         except Exception as e:
             logger.warning(f"Erreur lecture credentials.json: {e}")
             return False
 
 
+@lru_cache(maxsize=1)
 def get_gmail_service() -> GmailService:
-    """Factory pour obtenir une instance du service Gmail."""
+    """Factory pour obtenir une instance (partagée) du service Gmail."""
     return GmailService()
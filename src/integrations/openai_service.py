@@ -89,10 +89,11 @@ class OpenAIService:
         max_tokens: int = 2000,
         temperature: float = 0.7,
         json_mode: bool = False,
+        prompt_cache_key: str | None = None,
     ) -> str:
         """
         Génère une completion de texte via GPT.
-        
+
         Args:
             prompt: Le prompt utilisateur
             system_prompt: Instructions système optionnelles
@@ -100,7 +101,11 @@ class OpenAIService:
             max_tokens: Nombre maximum de tokens en sortie
             temperature: Créativité (0-1)
             json_mode: Si True, force le modèle à retourner du JSON valide
-            
+            prompt_cache_key: Clé de routage pour le cache de préfixe OpenAI.
+                Les appels partageant la même clé (et le même préfixe de
+                prompt système) sont routés vers le même cache serveur,
+                ce qui réduit le coût des tokens d'entrée et le TTFT
+
         Returns:
             Le texte généré
         """
@@ -128,6 +133,11 @@ class OpenAIService:
             "model": self.model,
             "messages": messages,
         }
+
+        # Clé de cache de préfixe (le préfixe statique du prompt système est
+        # mis en cache côté provider et re-servi aux appels suivants)
+        if prompt_cache_key:
+            params["prompt_cache_key"] = prompt_cache_key
         
         # Détermination des paramètres selon le modèle
         # Certains modèles (o1, gpt-5-nano) ne supportent pas temperature
@@ -166,6 +176,11 @@ class OpenAIService:
                 logger.warning(f"Le modèle {self.model} ne supporte pas response_format, désactivation du mode JSON")
                 params.pop("response_format", None)
                 response = self.client.chat.completions.create(**params)
+            elif "prompt_cache_key" in error_msg:
+                # L'API ne supporte pas la clé de cache de préfixe
+                logger.warning("prompt_cache_key non supporté par l'API, désactivation")
+                params.pop("prompt_cache_key", None)
+                response = self.client.chat.completions.create(**params)
             else:
                 raise
         
@@ -3,19 +3,53 @@ Service d'intégration Perplexity.
 Utilise l'API Perplexity Sonar pour rechercher des informations sur les entreprises.
 """
 
+import asyncio
+import atexit
+import json
 import logging
-from dataclasses import dataclass, field
+import os
+import random
+import re
+import string
+import time
+from collections.abc import AsyncIterator
+from dataclasses import asdict, dataclass, field
 from functools import lru_cache
+from pathlib import Path
 from typing import Optional
 
-from openai import OpenAI
+import httpx
+from openai import APIStatusError, AsyncOpenAI, OpenAI
 
 from src.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Pool de connexions partagé par tous les clients async: les recherches d'un
+# même gather se multiplexent sur une connexion TLS unique (HTTP/2) au lieu
+# de payer un handshake par client
+_HTTPX_LIMITS = httpx.Limits(max_keepalive_connections=50, max_connections=100)
+try:
+    _ASYNC_HTTP_CLIENT = httpx.AsyncClient(http2=True, timeout=30.0, limits=_HTTPX_LIMITS)
+except ImportError:
+    # Le paquet h2 (extra http2 de httpx) n'est pas installé: HTTP/1.1 avec
+    # keep-alive reste préférable à un pool par client
+    _ASYNC_HTTP_CLIENT = httpx.AsyncClient(timeout=30.0, limits=_HTTPX_LIMITS)
 
-@dataclass
+
+def _close_async_http_client() -> None:
+    """Ferme proprement le pool partagé à l'arrêt du process."""
+    try:
+        asyncio.run(_ASYNC_HTTP_CLIENT.aclose())
+    except RuntimeError:
+        # Un event loop tourne encore: l'OS libèrera les sockets
+        pass
+
+
+atexit.register(_close_async_http_client)
+
+
+@dataclass(slots=True)
 class CompanyResearch:
     """
     Résultat de la recherche sur une entreprise.
@@ -74,6 +108,75 @@ Fournis les informations suivantes de manière concise et factuelle:
 Réponds en français de manière structurée et concise.
 """
 
+# Template précompilé du prompt: substitute évite le re-parse de la format
+# string à chaque recherche
+_PROMPT_TMPL = string.Template(
+    COMPANY_RESEARCH_PROMPT.replace("{company}", "$company").replace("{website}", "$website")
+)
+
+# Prompt pour la recherche groupée: un seul appel couvre plusieurs entreprises
+MULTI_COMPANY_RESEARCH_PROMPT = """Recherche des informations sur CHACUNE des entreprises suivantes:
+{companies_block}
+
+Pour chaque entreprise, fournis un bloc délimité par un en-tête exact:
+
+### ENTREPRISE: [nom exact tel que listé ci-dessus]
+
+suivi des informations suivantes, de manière concise et factuelle:
+
+1. **Secteur d'activité**: Dans quel secteur opère cette entreprise?
+2. **Taille**: Estimation de la taille (startup, PME, ETI, grand groupe) et nombre d'employés si disponible
+3. **Produits/Services**: Quels sont leurs principaux produits ou services?
+4. **Actualités récentes**: Y a-t-il des actualités récentes importantes (levées de fonds, partenariats, lancements)?
+5. **Concurrents**: Quels sont les principaux concurrents sur leur marché?
+6. **Résumé**: Un bref résumé de 2-3 phrases sur cette entreprise
+
+Réponds en français, un bloc par entreprise, dans le même ordre que la liste.
+"""
+
+# En-tête de bloc dans la réponse groupée ("### ENTREPRISE: ACME")
+_MULTI_BLOCK_RE = re.compile(r"^#{2,}\s*ENTREPRISE\s*:\s*(?P<name>.+)$", re.MULTILINE)
+
+
+def _normalize_company(name: str) -> str:
+    """Normalise un nom d'entreprise pour l'appariement des blocs groupés."""
+    return " ".join(name.lower().replace("*", "").split())
+
+# Sections de la réponse de recherche: un seul scan regex découpe le markdown
+# en blocs étiquetés, chaque section courant jusqu'à l'étiquette suivante
+_SECTION_LABELS = r"secteur|taille|produits?|services?|actualit[ée]s?|news|concurrents?|r[ée]sum[ée]|summary"
+_SECTION_RE = re.compile(
+    rf"^[ \t]*[*\-#\d.)\s]*(?P<label>{_SECTION_LABELS})[^:\n]*:"
+    rf"(?P<value>.*?)"
+    rf"(?=^[ \t]*[*\-#\d.)\s]*(?:{_SECTION_LABELS})[^:\n]*:|\Z)",
+    re.IGNORECASE | re.MULTILINE | re.DOTALL,
+)
+
+# Étiquette (normalisée en minuscules) → attribut de CompanyResearch
+_SECTION_ATTRS = {
+    "secteur": "sector",
+    "taille": "size",
+    "produit": "products_services",
+    "produits": "products_services",
+    "service": "products_services",
+    "services": "products_services",
+    "actualité": "recent_news",
+    "actualités": "recent_news",
+    "actualite": "recent_news",
+    "actualites": "recent_news",
+    "news": "recent_news",
+    "concurrent": "competitors",
+    "concurrents": "competitors",
+    "résumé": "summary",
+    "résume": "summary",
+    "resume": "summary",
+    "resumé": "summary",
+    "summary": "summary",
+}
+
+# Longueur max du résumé de repli quand la réponse n'a aucune section "Résumé"
+_SUMMARY_FALLBACK_LEN = 1500
+
 
 class PerplexityService:
     """
@@ -86,15 +189,31 @@ class PerplexityService:
         self.api_key = settings.perplexity_api_key
         self.model = settings.perplexity_model
         
+        # Throttling client-side du chemin async: espace les départs de
+        # requêtes (perplexity_rpm) et borne les recherches simultanées,
+        # pour ne pas transformer un burst de webhooks en tempête de 429
+        self._semaphore = asyncio.Semaphore(settings.perplexity_concurrency)
+        self._min_interval = 60.0 / max(settings.perplexity_rpm, 1)
+        self._rate_lock = asyncio.Lock()
+        self._next_slot = 0.0
+
         if not self.api_key:
             logger.warning("⚠️ Clé API Perplexity non configurée - recherche entreprise désactivée")
             self.client = None
+            self.async_client = None
         else:
             # Perplexity utilise une API compatible OpenAI
             self.client = OpenAI(
                 api_key=self.api_key,
                 base_url="https://api.perplexity.ai"
             )
+            # Client async pour paralléliser les recherches multi-leads,
+            # adossé au pool de connexions partagé du module
+            self.async_client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url="https://api.perplexity.ai",
+                http_client=_ASYNC_HTTP_CLIENT,
+            )
             logger.info(f"PerplexityService initialisé (modèle: {self.model})")
     
     def is_available(self) -> bool:
@@ -116,30 +235,234 @@ class PerplexityService:
         Returns:
             CompanyResearch avec les informations trouvées
         """
-        # Vérification que le service est disponible
-        if not self.is_available():
+        failure = self._precheck(company)
+        if failure:
+            return failure
+
+        logger.info(f"🔍 Recherche Perplexity sur: {company}")
+
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=self._build_messages(company, website),
+                max_tokens=1000,
+                temperature=0.1,  # Très factuel
+            )
+
+            content = response.choices[0].message.content
+            logger.info(f"✅ Recherche Perplexity terminée ({len(content)} caractères)")
+
+            # Parsing de la réponse
+            return self._parse_research_response(company, content)
+
+        except Exception as e:
+            logger.error(f"❌ Erreur Perplexity: {e}")
             return CompanyResearch(
                 company_name=company,
                 success=False,
-                error="Service Perplexity non configuré"
+                error=str(e)
             )
-        
-        # Vérification que l'entreprise est renseignée
-        if not company or company.strip() == "":
+
+    async def research_company_async(
+        self,
+        company: str,
+        website: str | None = None
+    ) -> CompanyResearch:
+        """
+        Variante asynchrone de research_company.
+        Permet de recouvrir les I/O réseau quand plusieurs recherches partent
+        en parallèle (voir research_companies).
+
+        Args:
+            company: Nom de l'entreprise
+            website: URL du site web (optionnel mais recommandé)
+
+        Returns:
+            CompanyResearch avec les informations trouvées
+        """
+        failure = self._precheck(company)
+        if failure:
+            return failure
+
+        logger.info(f"🔍 Recherche Perplexity (async) sur: {company}")
+
+        try:
+            response = await self._create_with_retry(
+                model=self.model,
+                messages=self._build_messages(company, website),
+                max_tokens=1000,
+                temperature=0.1,  # Très factuel
+            )
+
+            content = response.choices[0].message.content
+            logger.info(f"✅ Recherche Perplexity terminée ({len(content)} caractères)")
+
+            return self._parse_research_response(company, content)
+
+        except Exception as e:
+            logger.error(f"❌ Erreur Perplexity: {e}")
             return CompanyResearch(
-                company_name="Inconnu",
+                company_name=company,
                 success=False,
-                error="Nom d'entreprise non fourni"
+                error=str(e)
             )
-        
-        logger.info(f"🔍 Recherche Perplexity sur: {company}")
-        
-        # Construction du prompt
-        prompt = COMPANY_RESEARCH_PROMPT.format(
-            company=company,
-            website=website or "Non fourni"
+
+    async def research_company_stream(
+        self,
+        company: str,
+        website: str | None = None
+    ) -> AsyncIterator[CompanyResearch]:
+        """
+        Variante streaming de la recherche: la réponse est re-parsée au fil
+        des tokens et un CompanyResearch partiel est émis à chaque section
+        close (double saut de ligne), le dernier émis étant l'objet complet.
+        Le traitement aval peut ainsi démarrer dès la première section au
+        lieu d'attendre le dernier token.
+
+        Args:
+            company: Nom de l'entreprise
+            website: URL du site web (optionnel mais recommandé)
+
+        Yields:
+            CompanyResearch de plus en plus complet
+        """
+        failure = self._precheck(company)
+        if failure:
+            yield failure
+            return
+
+        logger.info(f"🔍 Recherche Perplexity (stream) sur: {company}")
+
+        buffer = ""
+        try:
+            stream = await self._create_with_retry(
+                model=self.model,
+                messages=self._build_messages(company, website),
+                max_tokens=1000,
+                temperature=0.1,  # Très factuel
+                stream=True,
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                buffer += delta
+                # Une section vient de se fermer: émet l'état partiel
+                # (le scan regex sur le tampon accumulé reste en C, peu cher)
+                if "\n\n" in delta:
+                    yield self._parse_research_response(company, buffer)
+
+            logger.info(f"✅ Recherche Perplexity terminée ({len(buffer)} caractères)")
+            yield self._parse_research_response(company, buffer)
+
+        except Exception as e:
+            logger.error(f"❌ Erreur Perplexity: {e}")
+            yield CompanyResearch(
+                company_name=company,
+                success=False,
+                error=str(e)
+            )
+
+    async def _throttle(self) -> None:
+        """Espace les départs de requêtes pour respecter perplexity_rpm."""
+        async with self._rate_lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._min_interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _create_with_retry(self, **kwargs):
+        """
+        Appel chat.completions throttlé (rpm + concurrence bornée), avec
+        retries en backoff exponentiel jitté sur 429/5xx (plafond 60s).
+        """
+        max_retries = 3
+        for attempt in range(max_retries + 1):
+            await self._throttle()
+            async with self._semaphore:
+                try:
+                    return await self.async_client.chat.completions.create(**kwargs)
+                except APIStatusError as e:
+                    retryable = e.status_code == 429 or e.status_code >= 500
+                    if not retryable or attempt == max_retries:
+                        raise
+                    delay = min(2.0 * (2 ** attempt) * (1 + random.random() * 0.25), 60.0)
+                    logger.warning(
+                        f"⚠️ Perplexity {e.status_code}, retry {attempt + 1}/{max_retries} "
+                        f"dans {delay:.1f}s"
+                    )
+            await asyncio.sleep(delay)
+
+    async def research_companies(
+        self,
+        items: list[tuple[str, str | None]]
+    ) -> list[CompanyResearch]:
+        """
+        Recherche plusieurs entreprises en parallèle.
+        Les I/O réseau se recouvrent: N recherches coûtent ~la plus lente au
+        lieu de la somme des latences.
+
+        Args:
+            items: Liste de tuples (entreprise, site web)
+
+        Returns:
+            Liste de CompanyResearch, dans l'ordre des items
+        """
+        if not items:
+            return []
+
+        results = await asyncio.gather(
+            *(self.research_company_async(company, website) for company, website in items),
+            return_exceptions=True,
         )
-        
+
+        # Une exception inattendue devient un CompanyResearch en échec
+        return [
+            result if isinstance(result, CompanyResearch)
+            else CompanyResearch(company_name=items[i][0], success=False, error=str(result))
+            for i, result in enumerate(results)
+        ]
+
+    def research_companies_multi(
+        self,
+        items: list[tuple[str, str | None]]
+    ) -> list[CompanyResearch]:
+        """
+        Recherche groupée: un SEUL appel Perplexity couvre toutes les
+        entreprises du lot (un aller-retour HTTP au lieu de N), la réponse
+        étant découpée en blocs '### ENTREPRISE:' re-parsés individuellement.
+
+        Args:
+            items: Liste de tuples (entreprise, site web)
+
+        Returns:
+            Liste de CompanyResearch, dans l'ordre des items
+        """
+        if not items:
+            return []
+        if len(items) == 1:
+            company, website = items[0]
+            return [self.research_company(company, website)]
+
+        if not self.is_available():
+            return [
+                CompanyResearch(
+                    company_name=company,
+                    success=False,
+                    error="Service Perplexity non configuré"
+                )
+                for company, _ in items
+            ]
+
+        companies_block = "\n".join(
+            f"- {company} (site web: {website or 'non fourni'})"
+            for company, website in items
+        )
+        prompt = MULTI_COMPANY_RESEARCH_PROMPT.format(companies_block=companies_block)
+
+        logger.info(f"🔍 Recherche Perplexity groupée sur {len(items)} entreprises")
+
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -153,124 +476,212 @@ class PerplexityService:
                         "content": prompt
                     }
                 ],
-                max_tokens=1000,
+                max_tokens=min(1000 * len(items), 4000),
                 temperature=0.1,  # Très factuel
             )
-            
             content = response.choices[0].message.content
-            logger.info(f"✅ Recherche Perplexity terminée ({len(content)} caractères)")
-            
-            # Parsing de la réponse
-            return self._parse_research_response(company, content)
-            
+            logger.info(f"✅ Recherche groupée terminée ({len(content)} caractères)")
         except Exception as e:
-            logger.error(f"❌ Erreur Perplexity: {e}")
+            logger.error(f"❌ Erreur Perplexity (recherche groupée): {e}")
+            return [
+                CompanyResearch(company_name=company, success=False, error=str(e))
+                for company, _ in items
+            ]
+
+        return self._split_multi_response(items, content)
+
+    def _split_multi_response(
+        self,
+        items: list[tuple[str, str | None]],
+        content: str
+    ) -> list[CompanyResearch]:
+        """
+        Découpe la réponse groupée en blocs par entreprise et réassocie chaque
+        bloc via le nom capturé dans son en-tête, pas uniquement par position:
+        si le modèle omet ou réordonne une entreprise, les suivantes ne
+        reçoivent pas silencieusement la recherche d'un autre client. Le repli
+        positionnel ne joue que si l'en-tête ne désigne aucune autre
+        entreprise demandée (nom reformulé par le modèle).
+        """
+        headers = list(_MULTI_BLOCK_RE.finditer(content))
+
+        blocks: list[tuple[str, str]] = []  # (nom normalisé, texte du bloc)
+        for i, header in enumerate(headers):
+            end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+            blocks.append((
+                _normalize_company(header.group("name")),
+                content[header.end():end].strip(),
+            ))
+
+        normalized_items = [_normalize_company(company) for company, _ in items]
+        requested = set(normalized_items)
+
+        # Association par nom (premier bloc gagnant en cas de doublon)
+        blocks_by_name: dict[str, str] = {}
+        for name, text in blocks:
+            if name in requested:
+                blocks_by_name.setdefault(name, text)
+
+        results = []
+        for i, ((company, _), norm) in enumerate(zip(items, normalized_items)):
+            text = blocks_by_name.get(norm)
+            if text is None and i < len(blocks):
+                block_name, block_text = blocks[i]
+                if block_name not in requested:
+                    text = block_text
+            if text is not None:
+                results.append(self._parse_research_response(company, text))
+            else:
+                results.append(CompanyResearch(
+                    company_name=company,
+                    success=False,
+                    error="Bloc absent de la réponse groupée"
+                ))
+        return results
+
+    def _precheck(self, company: str) -> CompanyResearch | None:
+        """Retourne un échec immédiat si le service ou l'entreprise manquent."""
+        if not self.is_available():
             return CompanyResearch(
                 company_name=company,
                 success=False,
-                error=str(e)
+                error="Service Perplexity non configuré"
             )
-    
+
+        if not company or company.strip() == "":
+            return CompanyResearch(
+                company_name="Inconnu",
+                success=False,
+                error="Nom d'entreprise non fourni"
+            )
+
+        return None
+
+    def _build_messages(self, company: str, website: str | None) -> list[dict]:
+        """Construit les messages de la requête de recherche."""
+        prompt = _PROMPT_TMPL.substitute(
+            company=company,
+            website=website or "Non fourni"
+        )
+        return [
+            {
+                "role": "system",
+                "content": "Tu es un assistant de recherche d'entreprise. Fournis des informations précises et sourcées."
+            },
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ]
+
     def _parse_research_response(self, company: str, content: str) -> CompanyResearch:
         """
         Parse la réponse de Perplexity pour extraire les informations structurées.
+        Un seul scan regex (_SECTION_RE) découpe le markdown en sections
+        étiquetées, au lieu d'une boucle Python ligne par ligne.
         """
-        research = CompanyResearch(company_name=company, summary=content)
-        
-        # Extraction simple basée sur les en-têtes markdown
-        lines = content.split("\n")
-        current_section = None
-        current_content = []
-        
-        for line in lines:
-            line_lower = line.lower()
-            
-            # Détection des sections
-            if "secteur" in line_lower and ("activité" in line_lower or ":" in line):
-                if current_section:
-                    self._set_section(research, current_section, current_content)
-                current_section = "sector"
-                current_content = [line.split(":", 1)[-1].strip()] if ":" in line else []
-            elif "taille" in line_lower and ":" in line:
-                if current_section:
-                    self._set_section(research, current_section, current_content)
-                current_section = "size"
-                current_content = [line.split(":", 1)[-1].strip()]
-            elif "produit" in line_lower or "service" in line_lower and ":" in line:
-                if current_section:
-                    self._set_section(research, current_section, current_content)
-                current_section = "products"
-                current_content = [line.split(":", 1)[-1].strip()] if ":" in line else []
-            elif "actualité" in line_lower or "news" in line_lower:
-                if current_section:
-                    self._set_section(research, current_section, current_content)
-                current_section = "news"
-                current_content = [line.split(":", 1)[-1].strip()] if ":" in line else []
-            elif "concurrent" in line_lower:
-                if current_section:
-                    self._set_section(research, current_section, current_content)
-                current_section = "competitors"
-                current_content = [line.split(":", 1)[-1].strip()] if ":" in line else []
-            elif "résumé" in line_lower or "summary" in line_lower:
-                if current_section:
-                    self._set_section(research, current_section, current_content)
-                current_section = "summary_section"
-                current_content = [line.split(":", 1)[-1].strip()] if ":" in line else []
-            elif current_section and line.strip():
-                # Ajoute le contenu à la section courante
-                current_content.append(line.strip())
-        
-        # Dernière section
-        if current_section:
-            self._set_section(research, current_section, current_content)
-        
+        # Repli si aucune section "Résumé" n'est trouvée: on garde le début
+        # de la réponse brute, borné pour ne pas gonfler le cache et les prompts
+        research = CompanyResearch(company_name=company, summary=content[:_SUMMARY_FALLBACK_LEN])
+
+        for match in _SECTION_RE.finditer(content):
+            attr = _SECTION_ATTRS[match.group("label").lower()]
+            # Aplatis le bloc multi-lignes et nettoie les marqueurs markdown
+            text = " ".join(match.group("value").split()).strip("*-: ").strip()
+
+            if attr == "summary":
+                # Ne remplace le résumé complet que si on a extrait quelque chose
+                if text:
+                    research.summary = text
+            else:
+                setattr(research, attr, text)
+
         return research
-    
-    def _set_section(self, research: CompanyResearch, section: str, content: list[str]) -> None:
-        """Affecte le contenu à la section appropriée."""
-        text = " ".join(content).strip()
-        text = text.lstrip("*-:").strip()  # Nettoie les marqueurs markdown
-        
-        if section == "sector":
-            research.sector = text
-        elif section == "size":
-            research.size = text
-        elif section == "products":
-            research.products_services = text
-        elif section == "news":
-            research.recent_news = text
-        elif section == "competitors":
-            research.competitors = text
-        elif section == "summary_section":
-            # Ne remplace le résumé que si on a extrait quelque chose
-            if text:
-                research.summary = text
-
-
-# Cache pour éviter les appels redondants (même entreprise dans la même session)
+
+
+# Cache pour éviter les appels redondants (même entreprise dans la même session),
+# persisté sur disque pour survivre aux redémarrages (TTL 7 jours)
 _company_cache: dict[str, CompanyResearch] = {}
+_cache_timestamps: dict[str, float] = {}
+
+_CACHE_FILE = Path("cache/perplexity_companies.json")
+_CACHE_TTL_SECONDS = 7 * 86400
+_disk_cache_loaded = False
+
+
+def _load_disk_cache() -> None:
+    """Recharge (une seule fois) les recherches persistées non expirées."""
+    global _disk_cache_loaded
+    if _disk_cache_loaded:
+        return
+    _disk_cache_loaded = True
+
+    if not _CACHE_FILE.exists():
+        return
+
+    try:
+        entries = json.loads(_CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cache Perplexity illisible, ignoré: {e}")
+        return
 
+    now = time.time()
+    for key, entry in entries.items():
+        if now - entry.get("saved_at", 0) > _CACHE_TTL_SECONDS:
+            continue
+        try:
+            _company_cache[key] = CompanyResearch(**entry["data"])
+            _cache_timestamps[key] = entry["saved_at"]
+        except TypeError:
+            # Entrée d'un ancien format: on l'ignore simplement
+            continue
+
+    if _company_cache:
+        logger.info(f"♻️ Cache Perplexity rechargé ({len(_company_cache)} entreprises)")
+
+
+def _save_disk_cache() -> None:
+    """Persiste le cache de manière atomique (.tmp puis os.replace)."""
+    try:
+        _CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            key: {"saved_at": _cache_timestamps.get(key, time.time()), "data": asdict(research)}
+            for key, research in _company_cache.items()
+        }
+        tmp_path = _CACHE_FILE.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, _CACHE_FILE)
+    except OSError as e:
+        # Un disque en lecture seule ne doit pas casser le pipeline
+        logger.warning(f"Impossible de persister le cache Perplexity: {e}")
 
+
+@lru_cache(maxsize=1)
 def get_perplexity_service() -> PerplexityService:
-    """Retourne une instance du service Perplexity."""
+    """Retourne l'instance (partagée) du service Perplexity."""
     return PerplexityService()
 
 
 def research_company_cached(company: str, website: str | None = None) -> CompanyResearch:
     """
     Recherche avec cache pour éviter les appels API redondants.
+    Le cache est persisté sur disque: un redémarrage ne repaye pas les
+    recherches des 7 derniers jours.
     """
     cache_key = f"{company}|{website or ''}"
-    
+
+    _load_disk_cache()
     if cache_key in _company_cache:
         logger.debug(f"Cache hit pour: {company}")
         return _company_cache[cache_key]
-    
+
     service = get_perplexity_service()
     result = service.research_company(company, website)
-    
+
     # Cache uniquement les succès
     if result.success:
         _company_cache[cache_key] = result
-    
+        _cache_timestamps[cache_key] = time.time()
+        _save_disk_cache()
+
     return result
@@ -4,6 +4,8 @@ Basé sur la structure réelle des données envoyées par Tally.
 """
 
 from datetime import datetime
+from functools import cached_property
+
 from pydantic import BaseModel, Field
 
 
@@ -52,13 +54,23 @@ class TallyFormData(BaseModel):
     createdAt: datetime
     fields: list[TallyField]
     
+    @cached_property
+    def _fields_by_label(self) -> dict[str, TallyField]:
+        """
+        Index label normalisé → champ, construit en une seule passe.
+        parse_tally_to_lead interroge ~9 labels: l'index évite un scan
+        linéaire des champs par lookup.
+        """
+        index: dict[str, TallyField] = {}
+        for field in self.fields:
+            # setdefault: en cas de labels dupliqués, le premier champ gagne
+            # (même comportement que l'ancien scan linéaire)
+            index.setdefault(field.label.lower().strip().replace("\n", ""), field)
+        return index
+
     def get_field_by_label(self, label: str) -> TallyField | None:
         """Recherche un champ par son label (insensible à la casse et aux espaces)."""
-        normalized_label = label.lower().strip()
-        for field in self.fields:
-            if field.label.lower().strip().replace("\n", "") == normalized_label:
-                return field
-        return None
+        return self._fields_by_label.get(label.lower().strip())
     
     def get_field_value(self, label: str) -> str | None:
         """Retourne la valeur textuelle d'un champ par son label."""
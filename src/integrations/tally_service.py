@@ -3,16 +3,22 @@ Service de transformation des données Tally vers les modèles internes.
 """
 
 import logging
+import re
+
 from src.integrations.tally import TallyFormData, TallyWebhookPayload
 from src.models import LeadRequest, ServiceType
 
 logger = logging.getLogger(__name__)
 
-# Mapping des textes Tally vers les ServiceType
-SERVICE_TYPE_MAPPING = {
-    "mass mailing & lead gen": ServiceType.MASS_MAILING,
-    "automatisation & ia": ServiceType.AUTOMATION_IA,
-    "seo & growth hacking": ServiceType.SEO_GROWTH,
+# Classification du type de service: une regex précompilée reconnaît la
+# famille du libellé Tally (y compris les variantes "mass-mailing",
+# "Automatisation", "SEO"...) sans allouer de chaîne normalisée par webhook
+_SERVICE_RE = re.compile(r"(mass|automat|seo|growth)", re.IGNORECASE)
+_SERVICE_GROUP_MAPPING = {
+    "mass": ServiceType.MASS_MAILING,
+    "automat": ServiceType.AUTOMATION_IA,
+    "seo": ServiceType.SEO_GROWTH,
+    "growth": ServiceType.SEO_GROWTH,
 }
 
 
@@ -55,9 +61,10 @@ def parse_tally_to_lead(payload: TallyWebhookPayload) -> LeadRequest:
         raise ValueError("Le champ 'Votre Besoin' est requis")
     
     # Mapping du type de service
-    service_type = SERVICE_TYPE_MAPPING.get(
-        service_type_text.lower().strip(),
-        ServiceType.MASS_MAILING  # Fallback
+    match = _SERVICE_RE.search(service_type_text)
+    service_type = (
+        _SERVICE_GROUP_MAPPING[match.group(1).lower()]
+        if match else ServiceType.MASS_MAILING  # Fallback
     )
     
     # Vérification du consentement
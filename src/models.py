@@ -3,9 +3,49 @@ Modèles de données Pydantic pour l'Agent Juliette.
 Définit les structures pour les leads, devis et emails.
 """
 
-from datetime import datetime
+import re
+from datetime import datetime, timedelta, timezone
 from enum import Enum
-from pydantic import BaseModel, EmailStr, Field
+from functools import cached_property
+from typing import Annotated
+
+from pydantic import AfterValidator, BaseModel, Field, model_validator
+
+# Durée de validité d'un devis, construite une seule fois à l'import
+_THIRTY_DAYS = timedelta(days=30)
+
+_UTC = timezone.utc
+
+
+def _utcnow() -> datetime:
+    """Horodatage UTC tz-aware: évite la résolution du fuseau local de
+    datetime.now() naïf et profite du chemin rapide de sérialisation UTC."""
+    return datetime.now(_UTC)
+
+# Fast-path de validation email: les adresses usuelles (ASCII, un @, TLD)
+# sont acceptées par une regex précompilée; seules les formes atypiques
+# paient la validation RFC complète d'email-validator (IDNA, normalisation)
+_EMAIL_RE = re.compile(
+    r"[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+"
+    r"@[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?"
+    r"(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)+"
+)
+
+
+def _validate_email(value: str) -> str:
+    """Valide une adresse email (regex rapide, repli RFC complet)."""
+    if _EMAIL_RE.fullmatch(value):
+        return value
+
+    from email_validator import EmailNotValidError, validate_email
+
+    try:
+        return validate_email(value, check_deliverability=False).normalized
+    except EmailNotValidError as e:
+        raise ValueError(str(e)) from None
+
+
+Email = Annotated[str, AfterValidator(_validate_email)]
 
 
 class ServiceType(str, Enum):
@@ -23,7 +63,7 @@ class LeadRequest(BaseModel):
     # Informations de contact
     first_name: str = Field(..., min_length=2, description="Prénom du lead")
     last_name: str = Field(..., min_length=2, description="Nom du lead")
-    email: EmailStr = Field(..., description="Email professionnel du lead")
+    email: Email = Field(..., description="Email professionnel du lead")
     company: str | None = Field(None, description="Nom de l'entreprise")
     website: str | None = Field(None, description="Site web de l'entreprise")
     
@@ -35,7 +75,7 @@ class LeadRequest(BaseModel):
     # Métadonnées Tally
     tally_response_id: str = Field(..., description="ID de la réponse Tally")
     source: str = Field(default="tally", description="Source du lead")
-    received_at: datetime = Field(default_factory=datetime.now)
+    received_at: datetime = Field(default_factory=_utcnow)
     consent: bool = Field(default=False, description="Consentement à être recontacté")
     
     @property
@@ -62,12 +102,12 @@ class DevisContent(BaseModel):
     """
     # Référence
     reference: str = Field(..., description="Numéro de référence unique du devis")
-    created_at: datetime = Field(default_factory=datetime.now)
-    valid_until: datetime = Field(..., description="Date de validité du devis")
+    created_at: datetime = Field(default_factory=_utcnow)
+    valid_until: datetime | None = Field(None, description="Date de validité du devis (créée + 30 jours par défaut)")
     
     # Client
     client_name: str
-    client_email: EmailStr
+    client_email: Email
     client_company: str | None = None
     
     # Contenu
@@ -75,16 +115,25 @@ class DevisContent(BaseModel):
     introduction: str = Field(..., description="Texte d'introduction personnalisé")
     items: list[DevisItem] = Field(default_factory=list)
     conditions: str = Field(..., description="Conditions et modalités")
-    
-    # Totaux
-    @property
+
+    @model_validator(mode="after")
+    def _fill_valid_until(self) -> "DevisContent":
+        """Déduit valid_until de created_at si l'appelant ne l'a pas fourni."""
+        if self.valid_until is None:
+            self.valid_until = self.created_at + _THIRTY_DAYS
+        return self
+
+    # Totaux: le sous-total est sommé une seule fois par instance (le rendu
+    # PDF et l'email y accèdent plusieurs fois); les items ne sont jamais
+    # mutés après construction, le cache reste donc valide
+    @cached_property
     def subtotal(self) -> float:
         return sum(item.total for item in self.items)
-    
+
     @property
     def tva(self) -> float:
         return self.subtotal * 0.20  # TVA 20%
-    
+
     @property
     def total_ttc(self) -> float:
         return self.subtotal + self.tva
@@ -94,14 +143,14 @@ class EmailDraft(BaseModel):
     """
     Structure d'un brouillon d'email à créer dans Gmail.
     """
-    to: EmailStr
+    to: Email
     subject: str
     body_html: str
     attachment_path: str | None = Field(None, description="Chemin vers le PDF du devis")
     
     # Métadonnées
     lead_reference: str = Field(..., description="Référence du lead associé")
-    created_at: datetime = Field(default_factory=datetime.now)
+    created_at: datetime = Field(default_factory=_utcnow)
 
 
 class WebhookResponse(BaseModel):
@@ -46,6 +46,20 @@ def automation_lead() -> LeadRequest:
     )
 
 
+@pytest.fixture(scope="module")
+def generator():
+    """
+    Générateur mocké (sans connexion externe), partagé par tout le module:
+    _parse_response et _estimate_price_from_budget ne mutent aucun état,
+    une seule instance suffit pour tous les tests.
+    """
+    with patch('src.agent.devis_generator.get_openai_service') as mock_openai, \
+         patch('src.agent.devis_generator.get_qdrant_service') as mock_qdrant:
+        mock_openai.return_value = MagicMock()
+        mock_qdrant.return_value = MagicMock()
+        yield DevisGenerator()
+
+
 @pytest.fixture
 def valid_json_response() -> str:
     """Réponse JSON valide du LLM."""
@@ -165,16 +179,7 @@ class TestLLMDevisPayloadValidation:
 
 class TestDevisGeneratorParseResponse:
     """Tests pour la méthode _parse_response du générateur."""
-    
-    @pytest.fixture
-    def generator(self):
-        """Crée un générateur mocké (sans connexion externe)."""
-        with patch('src.agent.devis_generator.get_openai_service') as mock_openai, \
-             patch('src.agent.devis_generator.get_qdrant_service') as mock_qdrant:
-            mock_openai.return_value = MagicMock()
-            mock_qdrant.return_value = MagicMock()
-            return DevisGenerator()
-    
+
     def test_parse_valid_json_direct(self, generator, sample_lead, valid_json_response):
         """Parse un JSON valide directement."""
         result = generator._parse_response(valid_json_response, sample_lead)
@@ -233,15 +238,7 @@ class TestDevisGeneratorParseResponse:
 
 class TestEstimatePriceFromBudget:
     """Tests pour l'estimation du prix depuis le budget."""
-    
-    @pytest.fixture
-    def generator(self):
-        with patch('src.agent.devis_generator.get_openai_service') as mock_openai, \
-             patch('src.agent.devis_generator.get_qdrant_service') as mock_qdrant:
-            mock_openai.return_value = MagicMock()
-            mock_qdrant.return_value = MagicMock()
-            return DevisGenerator()
-    
+
     def test_budget_less_than_1k(self, generator):
         assert generator._estimate_price_from_budget("< 1 000€") == 800.0
         assert generator._estimate_price_from_budget("<1000€") == 800.0
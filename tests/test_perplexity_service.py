@@ -0,0 +1,82 @@
+"""
+Tests pour le service de recherche Perplexity.
+Valide le parsing des réponses markdown en CompanyResearch.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from src.integrations.perplexity_service import (
+    PerplexityService,
+    _SUMMARY_FALLBACK_LEN,
+)
+
+
+@pytest.fixture(scope="module")
+def service():
+    """Service sans clé API (aucun client réseau): seules les méthodes de parsing sont exercées."""
+    settings = MagicMock()
+    settings.perplexity_api_key = None
+    settings.perplexity_model = "sonar"
+    settings.perplexity_rpm = 60
+    settings.perplexity_concurrency = 5
+    with patch('src.integrations.perplexity_service.get_settings', return_value=settings):
+        return PerplexityService()
+
+
+class TestParseResearchResponse:
+    """Tests pour le découpage en sections de la réponse de recherche."""
+
+    def test_parse_structured_response(self, service):
+        """Extrait chaque section étiquetée vers le bon attribut."""
+        content = (
+            "1. Secteur: SaaS B2B\n"
+            "2. Taille: 50-100 employés\n"
+            "3. Produits/Services: CRM et facturation\n"
+            "4. Actualités: Levée de fonds série A\n"
+            "5. Concurrents: Salesforce, Pipedrive\n"
+            "6. Résumé: Éditeur français de CRM en forte croissance.\n"
+        )
+        research = service._parse_research_response("TechCorp", content)
+
+        assert research.company_name == "TechCorp"
+        assert research.sector == "SaaS B2B"
+        assert research.size == "50-100 employés"
+        assert research.products_services == "CRM et facturation"
+        assert research.recent_news == "Levée de fonds série A"
+        assert research.competitors == "Salesforce, Pipedrive"
+        assert research.summary == "Éditeur français de CRM en forte croissance."
+
+    def test_parse_markdown_decorations(self, service):
+        """Les marqueurs markdown (gras, puces) sont nettoyés."""
+        content = "- **Secteur**: E-commerce\n* **Résumé** : Boutique en ligne.\n"
+        research = service._parse_research_response("ShopCo", content)
+
+        assert research.sector == "E-commerce"
+        assert research.summary == "Boutique en ligne."
+
+    def test_multiline_section_flattened(self, service):
+        """Une section multi-lignes est aplatie en une seule chaîne."""
+        content = (
+            "Secteur: Industrie\n"
+            "automobile\n"
+            "Résumé: Équipementier.\n"
+        )
+        research = service._parse_research_response("AutoParts", content)
+
+        assert research.sector == "Industrie automobile"
+
+    def test_unstructured_response_falls_back_to_summary(self, service):
+        """Sans section reconnue, le texte brut sert de résumé."""
+        content = "Entreprise familiale fondée en 1982, spécialisée en menuiserie."
+        research = service._parse_research_response("Menuiserie Dupont", content)
+
+        assert research.summary == content
+        assert research.sector == ""
+
+    def test_fallback_summary_is_bounded(self, service):
+        """Le résumé de repli est tronqué à _SUMMARY_FALLBACK_LEN."""
+        content = "x" * (_SUMMARY_FALLBACK_LEN * 2)
+        research = service._parse_research_response("BigCo", content)
+
+        assert len(research.summary) == _SUMMARY_FALLBACK_LEN
@@ -0,0 +1,44 @@
+"""
+Tests pour la construction des prompts.
+Valide l'interprétation des fourchettes budgétaires du formulaire Tally.
+"""
+
+import pytest
+
+from src.agent.prompts import _interpret_budget
+
+
+class TestInterpretBudget:
+    """Tests table-driven sur les libellés budget canoniques de Tally."""
+
+    @pytest.mark.parametrize("budget_range,expected_bucket", [
+        # Palier serré (< 1 200€)
+        ("< 1 000€", "Budget serré"),
+        ("<1000€", "Budget serré"),
+        # Palier standard (jusqu'à 3 000€)
+        ("1 000 - 3 000€", "Budget standard"),
+        ("1-3k€", "Budget standard"),
+        # Palier confortable (jusqu'à 5 500€)
+        ("3 000 - 5 000€", "Budget confortable"),
+        ("3-5k€", "Budget confortable"),
+        ("2k-4k", "Budget confortable"),
+        # Palier élevé (jusqu'à 10 000€)
+        ("5 000 - 10 000€", "Budget élevé"),
+        ("5-10k€", "Budget élevé"),
+        # Budget ouvert vers le haut
+        ("10k€+", "Budget important"),
+        ("> 10 000€", "Budget important"),
+    ])
+    def test_canonical_ranges(self, budget_range, expected_bucket):
+        """Chaque libellé Tally tombe dans le bon palier."""
+        assert _interpret_budget(budget_range).startswith(expected_bucket)
+
+    def test_no_amount_falls_back(self):
+        """Un libellé sans montant produit l'interprétation générique."""
+        result = _interpret_budget("je ne sais pas")
+        assert "Budget à adapter" in result
+        assert "je ne sais pas" in result
+
+    def test_decimal_amounts(self):
+        """Les montants décimaux avec virgule sont compris ("2,5k")."""
+        assert _interpret_budget("2,5k€").startswith("Budget standard")